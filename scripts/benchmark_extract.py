@@ -0,0 +1,41 @@
+#!/usr/bin/python
+import sys
+import timeit
+from pathlib import Path
+
+from tailoredscoop.news.extract import ENGINES, extract_bs4
+
+# %% [markdown]
+"""
+Configuration
+
+usage: python scripts/benchmark_extract.py [directory of saved .html pages]
+"""
+
+# %%
+pages_dir = (
+    Path(sys.argv[1])
+    if len(sys.argv) > 1
+    else Path(__file__).resolve().parent.parent.joinpath("tailoredscoop/news/fake_news")
+)
+pages = [page.read_text(errors="replace") for page in sorted(pages_dir.glob("*.html"))]
+number = 50
+
+# %% [markdown]
+"""
+Benchmark
+"""
+
+# %%
+print(f"{len(pages)} pages from {pages_dir}, {number} runs each")
+reference = [extract_bs4(html) for html in pages]
+baseline = None
+for name, fn in ENGINES.items():
+    seconds = timeit.timeit(lambda: [fn(html) for html in pages], number=number)
+    ms_per_page = 1000 * seconds / (number * len(pages))
+    baseline = baseline or ms_per_page
+    matches = sum(fn(html) == ref for html, ref in zip(pages, reference))
+    print(
+        f"{name:>10}: {ms_per_page:8.3f} ms/page | {baseline / ms_per_page:5.2f}x"
+        f" | matches bs4 on {matches}/{len(pages)} pages"
+    )
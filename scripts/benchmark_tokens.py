@@ -0,0 +1,65 @@
+#!/usr/bin/python
+import sys
+import timeit
+from pathlib import Path
+
+import tiktoken
+
+from tailoredscoop.news.extract import extract_lxml
+from tailoredscoop.openai_api import num_tokens_from_messages, num_tokens_from_texts
+
+# %% [markdown]
+"""
+Configuration
+
+usage: python scripts/benchmark_tokens.py [directory of saved .html pages]
+
+Counts the tokens of one summary-sized text per page, the way
+`DocumentProcessor.process` does once per article.
+"""
+
+# %%
+pages_dir = (
+    Path(sys.argv[1])
+    if len(sys.argv) > 1
+    else Path(__file__).resolve().parent.parent.joinpath("tailoredscoop/news/fake_news")
+)
+texts = [
+    (extract_lxml(page.read_text(errors="replace")) or "")[:1500]
+    for page in sorted(pages_dir.glob("*.html"))
+]
+number = 20
+
+
+def uncached(messages, model="gpt-3.5-turbo"):
+    # the encoding lookup every call used to do before counting
+    tiktoken.encoding_for_model(model)
+    return num_tokens_from_messages(messages, model=model)
+
+
+# %% [markdown]
+"""
+Benchmark
+"""
+
+# %%
+num_tokens_from_messages([{"content": ""}], model="gpt-3.5-turbo")  # warm the cache
+runs = {
+    "uncached": lambda: [uncached([{"content": text}]) for text in texts],
+    "cached": lambda: [
+        num_tokens_from_messages([{"content": text}], model="gpt-3.5-turbo")
+        for text in texts
+    ],
+    "batch": lambda: num_tokens_from_texts(texts, model="gpt-3.5-turbo"),
+}
+
+print(f"{len(texts)} texts from {pages_dir}, {number} runs each")
+baseline = None
+for name, fn in runs.items():
+    seconds = timeit.timeit(fn, number=number)
+    us_per_article = 1e6 * seconds / (number * len(texts))
+    baseline = baseline or us_per_article
+    print(
+        f"{name:>10}: {us_per_article:8.1f} us/article"
+        f" | {baseline / us_per_article:5.2f}x"
+    )
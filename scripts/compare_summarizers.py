@@ -0,0 +1,89 @@
+#!/usr/bin/python
+import re
+import sys
+import time
+from pathlib import Path
+
+from tokenizers import Tokenizer
+
+from tailoredscoop.documents.backends import BACKENDS, load_summarizer
+from tailoredscoop.documents.process import DocumentProcessor
+from tailoredscoop.news.extract import extract_lxml
+
+# %% [markdown]
+"""
+Configuration
+
+usage: python scripts/compare_summarizers.py [directory of saved .html pages] [backend ...]
+
+Summarizes a fixed article set with each backend, using the same generation
+settings as `DocumentProcessor.process`, and compares latency and agreement
+(ROUGE-L F1) with the fp32 reference.
+"""
+
+# %%
+pages_dir = (
+    Path(sys.argv[1])
+    if len(sys.argv) > 1
+    else Path(__file__).resolve().parent.parent.joinpath("tailoredscoop/news/fake_news")
+)
+backends = sys.argv[2:] or list(BACKENDS)
+contents = [
+    content
+    for content in (
+        extract_lxml(page.read_text(errors="replace"))
+        for page in sorted(pages_dir.glob("*.html"))
+    )
+    if content
+]
+
+processor = DocumentProcessor()
+processor.tokenizer = Tokenizer.from_pretrained("bert-base-uncased")
+
+
+def rouge_l(candidate: str, reference: str) -> float:
+    a, b = re.findall(r"\w+", candidate.lower()), re.findall(r"\w+", reference.lower())
+    if not a or not b:
+        return 0.0
+    previous = [0] * (len(b) + 1)
+    for x in a:
+        current = [0]
+        for j, y in enumerate(b):
+            current.append(
+                previous[j] + 1 if x == y else max(previous[j + 1], current[j])
+            )
+        previous = current
+    lcs = previous[-1]
+    if lcs == 0:
+        return 0.0
+    precision, recall = lcs / len(a), lcs / len(b)
+    return 2 * precision * recall / (precision + recall)
+
+
+# %% [markdown]
+"""
+Compare
+"""
+
+# %%
+print(f"{len(contents)} articles from {pages_dir}")
+reference, reference_backend = None, None
+for backend in backends:
+    try:
+        summarizer = load_summarizer(backend)
+    except ImportError as e:
+        print(f"{backend:>6}: skipped | {e}")
+        continue
+    processor.summarize_batch(contents[:1], summarizer)  # warm up
+
+    start = time.perf_counter()
+    summaries = processor.summarize_batch(contents, summarizer)
+    seconds = (time.perf_counter() - start) / len(contents)
+
+    if reference is None:
+        reference, reference_backend = summaries, backend
+    agreement = sum(map(rouge_l, summaries, reference)) / len(contents)
+    print(
+        f"{backend:>6}: {seconds:6.2f} s/article"
+        f" | ROUGE-L vs {reference_backend}: {agreement:.3f}"
+    )
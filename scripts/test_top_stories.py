@@ -8,10 +8,10 @@ import asyncio
 import multiprocessing
 
 import openai
-from transformers import pipeline
 
 from tailoredscoop import api, config
 from tailoredscoop.db.init import SetupMongoDB
+from tailoredscoop.documents.backends import load_summarizer
 from tailoredscoop.news import newsapi_with_google_kw, users
 from tailoredscoop.utils import RecipientList
 
@@ -35,7 +35,7 @@ newsapi = newsapi_with_google_kw.NewsAPI(api_key=secrets["newsapi"]["api_key"])
 mongo_client = SetupMongoDB(mongo_url=secrets["mongodb"]["url"]).setup_mongodb()
 db = mongo_client.db1
 
-summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
+summarizer = load_summarizer()  # backend from SUMMARIZER_BACKEND
 sender = api.EmailSummary(news_downloader=newsapi, db=db, summarizer=summarizer)
 
 # %% [markdown]
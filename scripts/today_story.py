@@ -4,10 +4,10 @@ import logging
 
 import nest_asyncio
 import openai
-from transformers import pipeline
 
 from tailoredscoop import api, config, utils
 from tailoredscoop.db.init import SetupMongoDB
+from tailoredscoop.documents.backends import load_summarizer
 from tailoredscoop.today_story import MySQL
 
 # %% [markdown]
@@ -28,7 +28,7 @@ newsapi = api.NewsAPI(api_key=secrets["newsapi"]["api_key"])
 mongo_client = SetupMongoDB(mongo_url=secrets["mongodb"]["url"]).setup_mongodb()
 db = mongo_client.db1
 
-summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
+summarizer = load_summarizer()  # backend from SUMMARIZER_BACKEND
 sender = api.EmailSummary(news_downloader=newsapi, db=db, summarizer=summarizer)
 
 # %% [markdown]
@@ -5,6 +5,7 @@ import hashlib
 import logging
 import re
 from dataclasses import dataclass
+from functools import cached_property
 from typing import Dict, List, Optional, Tuple, Union
 
 import boto3
@@ -15,6 +16,9 @@ from pymongo.errors import DuplicateKeyError
 from transformers import pipeline
 
 from tailoredscoop import utils
+from tailoredscoop.db.lease import MongoLease
+from tailoredscoop.documents import executor
+from tailoredscoop.documents.dedupe import remove_near_duplicates
 from tailoredscoop.documents.summarize import OpenaiSummarizer
 from tailoredscoop.news.newsapi_with_google_kw import NewsAPI
 from tailoredscoop.openai_api import ChatCompletion
@@ -72,6 +76,14 @@ class Articles:
         # sort by rank
         articles = sorted(articles, key=lambda x: x["rank"])
 
+        # keep the best-ranked copy of stories syndicated across outlets
+        n_candidates = len(articles)
+        articles = remove_near_duplicates(articles)
+        if len(articles) < n_candidates:
+            self.logger.info(
+                f"removed {n_candidates - len(articles)} near-duplicate articles | {email} | {kw}"
+            )
+
         # return (self.check_shown_articles(email=email, articles=articles), kw)
         return articles
 
@@ -83,6 +95,9 @@ class Summaries(Articles):
     now: datetime.datetime
     openai_summarizer: OpenaiSummarizer
 
+    summary_lease_poll = 5
+    summarization_executor = executor.shared_executor
+
     def __post_init__(self):
         self.logger = logging.getLogger("tailoredscoops.api")
 
@@ -180,7 +195,8 @@ class Summaries(Articles):
             self.logger.error(f"not enough articles | {email} | {kw}")
             return {"summary": None, "titles": None, "encoded_urls": None}
 
-        res, titles, encoded_urls = news_downloader.process(
+        res, titles, encoded_urls = await self.summarization_executor.run(
+            news_downloader.process,
             articles,
             summarizer=self.summarizer,
             max_articles=8,
@@ -192,10 +208,7 @@ class Summaries(Articles):
             self.logger.error(f"not enough processed | {email} | {kw}")
             return {"summary": None, "titles": None, "encoded_urls": None}
 
-        loop = asyncio.get_running_loop()
-        summary = await loop.run_in_executor(
-            None, self.openai_summarizer.get_openai_summary, {"res": res}
-        )
+        summary = await self.openai_summarizer.aget_openai_summary({"res": res})
 
         self.upload_summary(
             summary=summary,
@@ -211,6 +224,45 @@ class Summaries(Articles):
             "encoded_urls": encoded_urls,
         }
 
+    @cached_property
+    def summary_requests(self) -> utils.SingleFlight:
+        return utils.SingleFlight()
+
+    @cached_property
+    def summary_lease(self) -> MongoLease:
+        return MongoLease(collection=self.db.summary_leases)
+
+    async def build_summary(
+        self, email: str, summary_id: str, kw: Optional[str] = None
+    ) -> Dict[str, Union[str, List[str], None]]:
+        """Create the summary unless another process holding its lease does."""
+
+        while True:
+            if self.summary_lease.acquire(summary_id):
+                # the build can outlast the lease ttl while inference is queued
+                renewal = asyncio.ensure_future(
+                    self.summary_lease.keep_alive(summary_id)
+                )
+                try:
+                    summary = self.db.summaries.find_one({"summary_id": summary_id})
+                    if summary:
+                        return summary
+                    return await self.create_summary(
+                        email=email,
+                        news_downloader=self.news_downloader,
+                        summary_id=summary_id,
+                        kw=kw,
+                    )
+                finally:
+                    renewal.cancel()
+                    self.summary_lease.release(summary_id)
+
+            self.logger.info(f"waiting for summary lease | {summary_id} | {kw}")
+            await asyncio.sleep(self.summary_lease_poll)
+            summary = self.db.summaries.find_one({"summary_id": summary_id})
+            if summary:
+                return summary
+
     async def get_summary(self, email: str, kw: Optional[str] = None) -> str:
         """Get the summary for the given email and keyword."""
 
@@ -220,9 +272,12 @@ class Summaries(Articles):
         if summary:
             self.logger.info("used cached summary")
         else:
-            summary = await self.create_summary(
+            # one build per summary_id: in-process via single-flight, across
+            # processes via the lease
+            summary = await self.summary_requests.do(
+                summary_id,
+                self.build_summary,
                 email=email,
-                news_downloader=self.news_downloader,
                 summary_id=summary_id,
                 kw=kw,
             )
@@ -237,6 +292,8 @@ class Subjects:
     summarizer: pipeline
     openai_summarizer: OpenaiSummarizer
 
+    summarization_executor = executor.shared_executor
+
     def __post_init__(self):
         self.logger = logging.getLogger("tailoredscoops.api")
 
@@ -270,17 +327,14 @@ class Subjects:
         )[0]["summary_text"]
 
     async def get_subject(self, plain_text_content, summary_id):
-        loop = asyncio.get_running_loop()
         subject = self.check_exists(summary_id)
         if subject:
             return subject["subject"]
         else:
-            abridged = self.abridge_summary(
-                plain_text_content, summarizer=self.summarizer
-            )
-            subject = await loop.run_in_executor(
-                None, self.openai_summarizer.get_subject, abridged
+            abridged = await self.summarization_executor.run(
+                self.abridge_summary, plain_text_content, summarizer=self.summarizer
             )
+            subject = await self.openai_summarizer.aget_subject(abridged)
             self.add_subject(summary_id, subject)
             return subject
 
@@ -397,4 +451,11 @@ class EmailSummary(Summaries, Subjects):
                 asyncio.create_task(self.send_one(email=email, kw=kw, test=test))
             )
 
-        await asyncio.gather(*tasks)
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            self.logger.info(
+                f"summarization executor | {self.summarization_executor.stats()}"
+            )
+            if self.news_downloader is not _no_default:
+                await self.news_downloader.close()
@@ -9,6 +9,24 @@ class SetupMongoDB:
     def setup_mongodb(self):
         self.client = MongoClient(self.mongo_url)
         self.client.db1.articles.create_index("url", unique=True)
+        self.client.db1.articles.create_index("link")
+        self.client.db1.article_download_fails.create_index("link")
+        self.client.db1.article_download_fails.create_index("url")
+        self.client.db1.link_redirects.create_index("link", unique=True)
+        self.client.db1.feed_cache.create_index("url", unique=True)
+        self.client.db1.extraction_rules.create_index("domain", unique=True)
+        self.client.db1.queries.create_index("query_id", unique=True)
+        self.client.db1.llm_memo.create_index([("kind", 1), ("key", 1)], unique=True)
+        self.client.db1.article_summaries.create_index("key", unique=True)
+        self.client.db1.boilerplate.create_index(
+            [("domain", 1), ("fingerprint", 1)], unique=True
+        )
+        self.client.db1.boilerplate_pages.create_index(
+            [("domain", 1), ("url", 1)], unique=True
+        )
+        # stale documents are deleted by BoilerplateFilter.prune with its own ttl
+        self.client.db1.boilerplate.create_index("seen_at")
+        self.client.db1.boilerplate_pages.create_index("seen_at")
         return self.client
 
     def delete_all(self, collection):
@@ -0,0 +1,65 @@
+import asyncio
+import datetime
+import logging
+import os
+import socket
+import uuid
+from dataclasses import dataclass, field
+from typing import Hashable
+
+import pymongo
+from pymongo.errors import DuplicateKeyError
+
+
+def _owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+@dataclass
+class MongoLease:
+    """
+    Cross-process mutual exclusion through lease documents.
+
+    A lease is a `{key, owner, expires_at}` document; a unique index on `key`
+    guarantees only one owner can hold an unexpired lease. Leases expire after
+    `ttl` so a crashed owner cannot block others forever; a live owner doing
+    longer work keeps its lease with `keep_alive`.
+
+    :param collection: Collection holding the lease documents.
+    :param ttl: How long a lease is held unless released earlier.
+    """
+
+    collection: pymongo.collection.Collection
+    ttl: datetime.timedelta = datetime.timedelta(minutes=10)
+    owner: str = field(default_factory=_owner)
+
+    def __post_init__(self):
+        self.logger = logging.getLogger("tailoredscoops.lease")
+        self.collection.create_index("key", unique=True)
+
+    def acquire(self, key: Hashable) -> bool:
+        """Take (or extend) the lease on `key`; False if someone else holds it."""
+        now = datetime.datetime.now()
+        try:
+            self.collection.update_one(
+                {
+                    "key": key,
+                    "$or": [{"expires_at": {"$lt": now}}, {"owner": self.owner}],
+                },
+                {"$set": {"owner": self.owner, "expires_at": now + self.ttl}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            return False
+        return True
+
+    async def keep_alive(self, key: Hashable) -> None:
+        """Extend the lease on `key` every third of `ttl` until cancelled."""
+        while True:
+            await asyncio.sleep(self.ttl.total_seconds() / 3)
+            if not self.acquire(key):
+                self.logger.error(f"lease lost | {key}")
+                return
+
+    def release(self, key: Hashable) -> None:
+        self.collection.delete_one({"key": key, "owner": self.owner})
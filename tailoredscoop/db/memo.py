@@ -0,0 +1,61 @@
+import collections
+import datetime
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+import pymongo
+
+
+@dataclass
+class MemoStore:
+    """
+    Mongo-backed memo (`db.llm_memo`) for answers that change slowly, keyed by
+    kind and normalized keyword.
+
+    :param ttl: How long a stored answer is reused.
+    """
+
+    ttl: datetime.timedelta = datetime.timedelta(days=7)
+
+    def __post_init__(self):
+        self.logger = logging.getLogger("tailoredscoops.MemoStore")
+        self.hits = collections.Counter()
+        self.misses = collections.Counter()
+
+    @staticmethod
+    def normalize(kw: str) -> str:
+        """Lower-case, drop quotes and collapse whitespace around and within terms."""
+        terms = [
+            " ".join(term.split()) for term in kw.lower().replace('"', "").split(",")
+        ]
+        return ",".join(term for term in terms if term)
+
+    def get(self, db: pymongo.database.Database, kind: str, kw: str) -> Optional[str]:
+        stored = db.llm_memo.find_one(
+            {
+                "kind": kind,
+                "key": self.normalize(kw),
+                "created_at": {"$gte": datetime.datetime.now() - self.ttl},
+            }
+        )
+        if stored is None:
+            self.misses[kind] += 1
+            return None
+        self.hits[kind] += 1
+        return stored["value"]
+
+    def set(
+        self, db: pymongo.database.Database, kind: str, kw: str, value: str
+    ) -> None:
+        db.llm_memo.update_one(
+            {"kind": kind, "key": self.normalize(kw)},
+            {"$set": {"value": value, "created_at": datetime.datetime.now()}},
+            upsert=True,
+        )
+
+    def stats(self) -> dict:
+        return {
+            kind: {"hits": self.hits[kind], "misses": self.misses[kind]}
+            for kind in set(self.hits) | set(self.misses)
+        }
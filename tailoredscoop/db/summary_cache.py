@@ -0,0 +1,67 @@
+import collections
+import datetime
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterable
+
+import pymongo
+from pymongo import UpdateOne
+
+
+@dataclass
+class SummaryCache:
+    """
+    Content-addressed article summaries in `db.article_summaries`.
+
+    A summary is keyed by a hash of the article content, the model name and the
+    generation parameters, so an article is summarized at most once per model
+    configuration, whichever keyword or run reaches it first.
+    """
+
+    def __post_init__(self):
+        self.logger = logging.getLogger("tailoredscoops.SummaryCache")
+        self.hits = collections.Counter()
+        self.misses = collections.Counter()
+
+    @staticmethod
+    def key(content: str, model: str, params: dict) -> str:
+        payload = json.dumps(
+            {"content": content, "model": model, "params": params}, sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_many(
+        self, db: pymongo.database.Database, keys: Iterable[str]
+    ) -> Dict[str, str]:
+        """
+        Look up many summaries in one query.
+
+        :return: Summary by key, for the keys that are stored.
+        """
+        keys = list(keys)
+        found = {
+            stored["key"]: stored["summary"]
+            for stored in db.article_summaries.find(
+                {"key": {"$in": keys}}, {"key": 1, "summary": 1}
+            )
+        }
+        self.hits["summary"] += len(found)
+        self.misses["summary"] += len(set(keys) - set(found))
+        return found
+
+    @staticmethod
+    def operation(key: str, summary: str, model: str) -> UpdateOne:
+        """Upsert for a new summary, to be queued on a `BulkWriter`."""
+        return UpdateOne(
+            {"key": key},
+            {
+                "$set": {
+                    "summary": summary,
+                    "model": model,
+                    "created_at": datetime.datetime.now(),
+                }
+            },
+            upsert=True,
+        )
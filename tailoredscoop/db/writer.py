@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import pymongo
+from pymongo.errors import BulkWriteError, PyMongoError
+
+
+@dataclass
+class BulkWriter:
+    """
+    Buffers write operations for one collection and sends them as unordered
+    `bulk_write` batches.
+
+    A batch is written once `max_ops` operations are pending or the oldest one
+    has waited `max_delay` seconds. Inside a running event loop the write is
+    handed to the default executor, and a timer sends a batch that stops
+    growing; `drain()` waits for everything to land. A batch that fails as a
+    whole (e.g. on a lost connection) is put back and retried with the next one.
+
+    :param collection: Collection the operations are written to.
+    :param max_ops: Maximum number of operations per batch.
+    :param max_delay: Maximum seconds an operation waits before its batch is sent.
+    """
+
+    collection: pymongo.collection.Collection
+    max_ops: int = 100
+    max_delay: float = 1.0
+
+    def __post_init__(self):
+        self.logger = logging.getLogger("tailoredscoops.BulkWriter")
+        self.lock = threading.Lock()
+        self.pending: List[Tuple[Any, Any]] = []
+        self.first_pending_at: Optional[float] = None
+        self.in_flight: set = set()
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.errors: List[dict] = []
+        self.n_written = 0
+
+    def add(self, operation, key: Any = None) -> None:
+        """
+        Queue a write operation (e.g. `ReplaceOne`, `UpdateOne`).
+
+        :param operation: pymongo write operation.
+        :param key: Identifies the document in error reports (e.g. its url).
+        """
+        with self.lock:
+            self.pending.append((key, operation))
+            first = self.first_pending_at is None
+            if first:
+                self.first_pending_at = time.monotonic()
+            due = (
+                len(self.pending) >= self.max_ops
+                or time.monotonic() - self.first_pending_at >= self.max_delay
+            )
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            if due:
+                self.flush()
+            return
+        if due:
+            self.flush_in_background(loop)
+        elif first:
+            self.timer = loop.call_later(self.max_delay, self.flush_in_background, loop)
+
+    def flush_in_background(self, loop: asyncio.AbstractEventLoop) -> None:
+        future = loop.run_in_executor(None, self.flush)
+        self.in_flight.add(future)
+        future.add_done_callback(self.flushed)
+
+    def flushed(self, future: asyncio.Future) -> None:
+        self.in_flight.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            self.logger.error(
+                f"bulk write failed | {self.collection.name} | {future.exception()}"
+            )
+
+    def flush(self) -> List[dict]:
+        """
+        Write all pending operations now.
+
+        :return: One error report per document that failed to write.
+        """
+        with self.lock:
+            batch, self.pending = self.pending, []
+            self.first_pending_at = None
+        if not batch:
+            return []
+
+        errors = []
+        try:
+            self.collection.bulk_write([op for _, op in batch], ordered=False)
+        except BulkWriteError as e:
+            errors = [
+                {
+                    "key": batch[error["index"]][0],
+                    "code": error.get("code"),
+                    "errmsg": error.get("errmsg"),
+                }
+                for error in e.details.get("writeErrors", [])
+            ]
+            for error in errors:
+                self.logger.error(
+                    f"bulk write failed | {self.collection.name}"
+                    f" | {error['key']} | {error['errmsg']}"
+                )
+        except PyMongoError as e:
+            self.logger.error(
+                f"bulk write failed, {len(batch)} operations requeued"
+                f" | {self.collection.name} | {e}"
+            )
+            with self.lock:
+                self.pending = batch + self.pending
+                if self.first_pending_at is None:
+                    self.first_pending_at = time.monotonic()
+            return []
+
+        with self.lock:
+            self.errors += errors
+            self.n_written += len(batch) - len(errors)
+        return errors
+
+    async def drain(self) -> None:
+        """
+        Write all pending operations and wait for batches already in flight.
+        """
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.flush)
+        if self.in_flight:
+            await asyncio.gather(*self.in_flight)
+        if self.pending:
+            self.logger.error(
+                f"{len(self.pending)} operations not written | {self.collection.name}"
+            )
+
+
+class BulkWriters:
+    """
+    One `BulkWriter` per collection.
+    """
+
+    def __init__(self, max_ops: int = 100, max_delay: float = 1.0):
+        self.max_ops = max_ops
+        self.max_delay = max_delay
+        self.writers: Dict[Tuple[int, str], BulkWriter] = {}
+        # writers are also requested from the summarization thread
+        self.lock = threading.Lock()
+
+    def get(self, collection: pymongo.collection.Collection) -> BulkWriter:
+        key = (id(collection.database), collection.name)
+        with self.lock:
+            if key not in self.writers:
+                self.writers[key] = BulkWriter(
+                    collection=collection,
+                    max_ops=self.max_ops,
+                    max_delay=self.max_delay,
+                )
+            return self.writers[key]
+
+    def flush(self) -> None:
+        for writer in list(self.writers.values()):
+            writer.flush()
+
+    async def drain(self) -> None:
+        for writer in list(self.writers.values()):
+            await writer.drain()
@@ -0,0 +1,58 @@
+import logging
+import os
+from typing import Optional
+
+from transformers import AutoModelForSeq2SeqLM, AutoTokenizer, pipeline
+
+SUMMARIZER_MODEL = "facebook/bart-large-cnn"
+BACKENDS = ("fp32", "int8", "onnx")
+
+logger = logging.getLogger("tailoredscoops.backends")
+
+
+def load_summarizer(backend: Optional[str] = None, model: str = SUMMARIZER_MODEL):
+    """
+    Build the summarization pipeline on the requested CPU backend.
+
+    Every backend returns a transformers `pipeline`, so callers use the same
+    interface (`summarizer(text, min_length=..., max_length=...)`).
+
+    :param backend: "fp32" (reference), "int8" (dynamic quantization of the
+        Linear layers) or "onnx" (ONNX Runtime export, needs
+        `optimum[onnxruntime]`). Defaults to the SUMMARIZER_BACKEND environment
+        variable, or "fp32".
+    :param model: Hugging Face model name.
+    """
+    backend = backend or os.environ.get("SUMMARIZER_BACKEND", "fp32")
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"unknown summarizer backend {backend}; choose from {BACKENDS}"
+        )
+
+    if backend == "fp32":
+        summarizer = pipeline("summarization", model=model)
+    elif backend == "int8":
+        import torch
+
+        tokenizer = AutoTokenizer.from_pretrained(model)
+        quantized = torch.quantization.quantize_dynamic(
+            AutoModelForSeq2SeqLM.from_pretrained(model),
+            {torch.nn.Linear},
+            dtype=torch.qint8,
+        )
+        summarizer = pipeline("summarization", model=quantized, tokenizer=tokenizer)
+    else:
+        try:
+            from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        except ImportError as e:
+            raise ImportError(
+                "the onnx summarizer backend needs optimum: pip install 'optimum[onnxruntime]'"
+            ) from e
+        tokenizer = AutoTokenizer.from_pretrained(model)
+        exported = ORTModelForSeq2SeqLM.from_pretrained(model, export=True)
+        summarizer = pipeline("summarization", model=exported, tokenizer=tokenizer)
+
+    # distinguishes the backends' outputs, e.g. in the summary cache key
+    summarizer.backend = backend
+    logger.info(f"loaded summarizer | {model} | {backend}")
+    return summarizer
@@ -0,0 +1,152 @@
+import logging
+import re
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, List, Optional, Set
+
+import numpy as np
+
+_WORD = re.compile(r"\w+")
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+logger = logging.getLogger("tailoredscoops.dedupe")
+
+
+def shingles(text: str, size: int = 5) -> np.ndarray:
+    """
+    Stable 32-bit hashes of the word `size`-grams of `text`.
+
+    Texts shorter than `size` words yield a single shingle of the whole text;
+    texts without words yield none.
+    """
+    words = _WORD.findall(text.lower())
+    grams = {
+        " ".join(words[i : i + size])
+        for i in range(max(len(words) - size + 1, 1) if words else 0)
+    }
+    return np.fromiter(
+        (zlib.crc32(gram.encode("utf-8")) for gram in grams),
+        dtype=np.uint64,
+        count=len(grams),
+    )
+
+
+@dataclass
+class MinHasher:
+    """
+    MinHash signatures over word shingles, computed for all permutations at once.
+
+    :param num_perm: Signature length.
+    :param shingle_size: Words per shingle.
+    :param seed: Seed of the permutations; signatures only compare under the same seed.
+    """
+
+    num_perm: int = 64
+    shingle_size: int = 5
+    seed: int = 1
+
+    def __post_init__(self):
+        rng = np.random.RandomState(self.seed)
+        self.a = rng.randint(1, 1 << 32, size=self.num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, 1 << 32, size=self.num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = shingles(text, self.shingle_size)
+        # (n_shingles, num_perm) universal hashes; uint64 products wrap, which
+        # is still a fixed hash family
+        permuted = (np.outer(hashes, self.a) + self.b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0)
+
+    @staticmethod
+    def similarity(a: np.ndarray, b: np.ndarray) -> float:
+        """Estimated Jaccard similarity of the texts behind two signatures."""
+        return float(np.mean(a == b))
+
+
+@dataclass
+class NearDuplicateIndex:
+    """
+    LSH index of MinHash signatures.
+
+    Signatures are split into `bands` bands; texts sharing any band are
+    candidates, and candidates whose estimated similarity reaches `threshold`
+    are near duplicates. Entries can be added for a whole day's corpus and
+    queried one article at a time.
+
+    :param hasher: Computes the signatures; `num_perm` must divide into `bands`.
+    :param bands: Number of LSH bands.
+    :param threshold: Estimated Jaccard similarity at which texts are duplicates.
+    """
+
+    hasher: MinHasher = field(default_factory=MinHasher)
+    bands: int = 16
+    threshold: float = 0.8
+
+    def __post_init__(self):
+        if self.hasher.num_perm % self.bands:
+            raise ValueError(
+                f"num_perm={self.hasher.num_perm} is not divisible"
+                f" by bands={self.bands}"
+            )
+        self.rows = self.hasher.num_perm // self.bands
+        self.buckets: Dict[tuple, Set[Hashable]] = defaultdict(set)
+        self.signatures: Dict[Hashable, np.ndarray] = {}
+
+    def band_keys(self, signature: np.ndarray) -> List[tuple]:
+        return [
+            (band, signature[band * self.rows : (band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def add(self, key: Hashable, text: str, signature: Optional[np.ndarray] = None):
+        if signature is None:
+            signature = self.hasher.signature(text)
+        self.signatures[key] = signature
+        for band_key in self.band_keys(signature):
+            self.buckets[band_key].add(key)
+        return signature
+
+    def query(
+        self, text: str, signature: Optional[np.ndarray] = None
+    ) -> List[Hashable]:
+        """Keys of indexed texts that are near duplicates of `text`."""
+        if signature is None:
+            signature = self.hasher.signature(text)
+        candidates = set().union(
+            *(self.buckets.get(band_key, ()) for band_key in self.band_keys(signature))
+        )
+        return [
+            key
+            for key in candidates
+            if self.hasher.similarity(signature, self.signatures[key]) >= self.threshold
+        ]
+
+
+def remove_near_duplicates(
+    articles: List[dict], index: Optional[NearDuplicateIndex] = None
+) -> List[dict]:
+    """
+    Keep the first article of each cluster of near-duplicate stories.
+
+    :param articles: Articles in rank order; each may carry "content" and "url".
+    :param index: Index to add the kept articles to; a fresh one by default.
+    :return: The articles that are not near duplicates of a better-ranked one.
+        Articles without content, or whose content has no words, are always kept.
+    """
+    index = index if index is not None else NearDuplicateIndex()
+    kept = []
+    for i, article in enumerate(articles):
+        content = article.get("content")
+        if not content or not _WORD.search(content):
+            kept.append(article)
+            continue
+        signature = index.hasher.signature(content)
+        duplicates = index.query(content, signature=signature)
+        if duplicates:
+            logger.info(f"near duplicate | {article.get('url')} | of {duplicates[0]}")
+            continue
+        index.add(article.get("url", i), content, signature=signature)
+        kept.append(article)
+    return kept
@@ -0,0 +1,127 @@
+import asyncio
+import collections
+import concurrent.futures
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Deque
+
+
+@dataclass
+class SummarizationExecutor:
+    """
+    Runs summarization (BART) calls on a dedicated inference thread.
+
+    Coroutines `await run(fn, ...)` and the event loop keeps serving downloads,
+    Mongo calls and sends while the model runs. Requests are served in arrival
+    order; at most `max_queue` may be waiting per event loop, further callers
+    wait (without blocking the loop) for a free slot.
+
+    :param max_queue: Maximum requests queued or running per event loop.
+    :param history: Number of recent requests kept for latency metrics.
+    """
+
+    max_queue: int = 16
+    history: int = 500
+
+    def __post_init__(self):
+        self.logger = logging.getLogger("tailoredscoops.SummarizationExecutor")
+        self.requests: queue.Queue = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+        self._semaphore = None
+        self._semaphore_loop = None
+        # (seconds queued, seconds running) per completed request
+        self.latencies: Deque = collections.deque(maxlen=self.history)
+        self.n_completed = 0
+        self.n_failed = 0
+
+    def get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_queue)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    def start(self) -> None:
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self.work, name="summarization", daemon=True
+                )
+                self.thread.start()
+
+    def work(self) -> None:
+        while True:
+            request = self.requests.get()
+            if request is None:
+                return
+            future, fn, args, kwargs, submitted_at = request
+            if not future.set_running_or_notify_cancel():
+                continue
+            started_at = time.perf_counter()
+            result, error = None, None
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                error = e
+            finished_at = time.perf_counter()
+
+            # metrics are recorded before the caller is woken
+            self.latencies.append(
+                (started_at - submitted_at, finished_at - started_at)
+            )
+            self.n_completed += 1
+            self.n_failed += error is not None
+            self.logger.info(
+                f"{getattr(fn, '__name__', fn)} | queued {started_at - submitted_at:.2f}s | ran {finished_at - started_at:.2f}s | depth {self.requests.qsize()}"
+            )
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def submit(self, fn: Callable, *args, **kwargs) -> concurrent.futures.Future:
+        """Queue `fn(*args, **kwargs)` for the inference thread."""
+        self.start()
+        future = concurrent.futures.Future()
+        self.requests.put((future, fn, args, kwargs, time.perf_counter()))
+        return future
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run `fn(*args, **kwargs)` on the inference thread and await its result."""
+        async with self.get_semaphore():
+            return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def stats(self) -> dict:
+        """Queue depth and latency percentiles over the recent requests."""
+        latencies = list(self.latencies)
+
+        def percentile(values, q):
+            if not values:
+                return None
+            values = sorted(values)
+            return values[min(len(values) - 1, int(q * len(values)))]
+
+        queued = [x for x, _ in latencies]
+        total = [x + y for x, y in latencies]
+        return {
+            "depth": self.requests.qsize(),
+            "completed": self.n_completed,
+            "failed": self.n_failed,
+            "queued_p50": percentile(queued, 0.5),
+            "latency_p50": percentile(total, 0.5),
+            "latency_p95": percentile(total, 0.95),
+        }
+
+    def shutdown(self) -> None:
+        if self.thread is not None and self.thread.is_alive():
+            self.requests.put(None)
+            self.thread.join()
+        self.thread = None
+
+
+# one inference thread per process, shared by everything that runs the model
+shared_executor = SummarizationExecutor()
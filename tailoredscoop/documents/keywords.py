@@ -1,7 +1,10 @@
 import logging
 from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
 
-from tailoredscoop import openai_api
+import pymongo
+
+from tailoredscoop import openai_api, utils
 
 
 @dataclass
@@ -9,8 +12,56 @@ class Keywords:
     def __post_init__(self):
         self.logger = logging.getLogger("tailoredscoops.Keywords")
 
-    def get_similar_keywords_from_gpt(self, kw):
+    async def memoized(
+        self,
+        db: Optional[pymongo.database.Database],
+        kind: str,
+        kw: str,
+        compute: Callable[[], Awaitable[str]],
+    ) -> str:
+        """
+        Answer from `keyword_memo`, or `await compute()` and remember it.
+
+        :param db: Database holding the memo; without it, always computes.
+        :param kind: Kind of answer, e.g. "topic".
+        :param kw: Keywords the answer is for.
+        :param compute: Requests the answer when it is not memoized.
+        :return: The answer; empty answers are not memoized.
+        """
+        if db is not None:
+            cached = self.keyword_memo.get(db=db, kind=kind, kw=kw)
+            if cached is not None:
+                self.logger.info(f"{kw} | {kind} (memo): {cached}")
+                return cached
+
+        value = await compute()
+        if db is not None and value:
+            self.keyword_memo.set(db=db, kind=kind, kw=kw, value=value)
+        return value
+
+    def get_similar_keywords_from_gpt(
+        self, kw, db: Optional[pymongo.database.Database] = None
+    ):
+        return utils.run_sync(self.aget_similar_keywords_from_gpt(kw, db=db))
 
+    async def aget_similar_keywords_from_gpt(
+        self, kw, db: Optional[pymongo.database.Database] = None
+    ):
+        return await self.memoized(
+            db, "similar_keywords", kw, lambda: self.arequest_similar_keywords(kw)
+        )
+
+    async def arequest_similar_keywords(self, kw):
+        response = await self.openai_api.acreate(
+            model="gpt-3.5-turbo",
+            messages=self.similar_keywords_messages(kw),
+            temperature=0.2,
+            max_tokens=10,
+        )
+        return self.clean_similar_keywords(kw, response)
+
+    @staticmethod
+    def similar_keywords_messages(kw):
         messages = [
             {
                 "role": "system",
@@ -29,10 +80,10 @@ class Keywords:
             {"role": "user", "content": f"keywords: {kw}"},
             {"role": "system", "content": "keywords:"},
         ]
+        return messages
 
-        response = self.openai_api.create(
-            model="gpt-3.5-turbo", messages=messages, temperature=0.2, max_tokens=10
-        )["choices"][0]["message"]["content"]
+    def clean_similar_keywords(self, kw, response):
+        response = response["choices"][0]["message"]["content"]
 
         self.logger.info(f"{kw} | similar keyword: {response}")
 
@@ -41,8 +92,23 @@ class Keywords:
 
         return response.replace('"', "").replace("'", "")
 
-    def get_topic(self, kw):
+    def get_topic(self, kw, db: Optional[pymongo.database.Database] = None):
+        return utils.run_sync(self.aget_topic(kw, db=db))
+
+    async def aget_topic(self, kw, db: Optional[pymongo.database.Database] = None):
+        return await self.memoized(db, "topic", kw, lambda: self.arequest_topic(kw))
+
+    async def arequest_topic(self, kw):
+        response = await self.openai_api.acreate(
+            model="gpt-3.5-turbo",
+            messages=self.topic_messages(kw),
+            temperature=0.1,
+            max_tokens=2,
+        )
+        return self.clean_topic(kw, response)
 
+    @staticmethod
+    def topic_messages(kw):
         messages = [
             {"role": "system", "content": "You are a classification tool."},
             {
@@ -56,10 +122,10 @@ class Keywords:
             {"role": "user", "content": f"keywords: {kw}"},
             {"role": "system", "content": "subcategory:"},
         ]
+        return messages
 
-        response = self.openai_api.create(
-            model="gpt-3.5-turbo", messages=messages, temperature=0.1, max_tokens=2
-        )["choices"][0]["message"]["content"]
+    def clean_topic(self, kw, response):
+        response = response["choices"][0]["message"]["content"]
 
         self.logger.info(f"using topic: {kw} | got topic: {response}")
 
@@ -1,41 +1,87 @@
 import base64
 import hashlib
+import itertools
 import logging
+import re
+import time
+from collections import defaultdict
 from dataclasses import dataclass
-from typing import Optional
+from typing import Iterator, List, Optional, Tuple
 
 import pymongo
+from pymongo import UpdateOne
 
 from tailoredscoop import utils
 
 from .summarize import OpenaiSummarizer
 
+SENTENCE_ENDS = {".", "!", "?"}
+
+PAYWALL = re.compile(
+    r"subscribe (now )?to (continue|read)|already a subscriber|"
+    r"sign in to (continue|read)|to continue reading|create a free account|"
+    r"this (article|content) is (only )?(available|reserved) (to|for) subscribers",
+    re.IGNORECASE,
+)
+
 
 @dataclass
 class DocumentProcessor:
+    # articles per forward pass of the summarization pipeline
+    summary_batch_size = 8
+    # generation settings shared by every article; part of the summary cache key
+    summary_params = {
+        "truncation": "only_first",
+        "length_penalty": 2,
+        "early_stopping": True,
+        "num_beams": 1,
+        # "no_repeat_ngram_size": 3,
+    }
+    # summaries shorter than this (in OpenAI tokens) are not sent to OpenAI
+    min_summary_tokens = 100
+    # teaser-length articles matching PAYWALL are skipped before inference
+    paywall_max_tokens = 400
+    # articles longer than this many tokens are summarized chunk by chunk and
+    # the chunk summaries summarized again; None truncates them instead
+    long_form_tokens = None
+    # tokens per chunk in long-form mode; must fit the model's input window
+    chunk_tokens = 900
+
     def __post_init__(self):
         self.logger = logging.getLogger("tailoredscoops.DocumentProcessor")
 
-    def split_text_into_chunks(self, text, max_chunk_size=3000):
-        chunks = []
-        current_chunk = ""
-
-        # Split the text into words
-        words = text.split()
+    def split_text_into_chunks(
+        self, text: str, max_tokens: int = 900, encoding=None
+    ) -> Iterator[str]:
+        """
+        Lazily cut `text` into pieces of at most `max_tokens` tokenizer tokens.
 
-        for word in words:
-            # If adding the current word exceeds the maximum chunk size, start a new chunk
-            if len(current_chunk) + len(word) + 1 > max_chunk_size:
-                chunks.append(current_chunk.strip())
-                current_chunk = ""
+        Cuts fall on token boundaries taken from the tokenizer's character
+        offsets, preferring the end of a sentence in the last quarter of each
+        window. Each piece is a single slice of `text`. Special tokens added by
+        the tokenizer's post-processor ([CLS], [SEP]) cover no text and are
+        skipped.
 
-            # Add the word to the current chunk
-            current_chunk += word + " "
-
-        # Append the last chunk
-        chunks.append(current_chunk.strip())
-
-        return chunks
+        :param encoding: Tokenizer output for `text`, if already computed.
+        """
+        encoding = encoding or self.tokenizer.encode(text)
+        special = getattr(encoding, "special_tokens_mask", None)
+        offsets = [
+            offset
+            for i, offset in enumerate(encoding.offsets)
+            if not (special and special[i])
+        ]
+        start = 0
+        while start < len(offsets):
+            end = min(start + max_tokens, len(offsets))
+            if end < len(offsets):
+                for cut in range(end, start + (3 * max_tokens) // 4, -1):
+                    begin, stop = offsets[cut - 1]
+                    if text[begin:stop] in SENTENCE_ENDS:
+                        end = cut
+                        break
+            yield text[offsets[start][0] : offsets[end - 1][1]]
+            start = end
 
     @staticmethod
     def encode_urls(urls, email: Optional[str] = None):
@@ -46,6 +92,157 @@ class DocumentProcessor:
             for url in urls
         ]
 
+    def summary_lengths(self, n_tokens: int):
+        """`min_length`/`max_length` for an article of `n_tokens` input tokens."""
+        return int(min(n_tokens / 3, 200)), int(min(n_tokens / 2, 250))
+
+    def screen(self, content: str, n_tokens: int) -> Optional[str]:
+        """
+        Predict whether an article's summary will fail the `min_summary_tokens` rule.
+
+        :param content: Article text.
+        :param n_tokens: Tokenizer count of `content`.
+        :return: Why the article should be skipped before inference, or None.
+        """
+        # summary length is capped at max_length; 7 is the message overhead
+        # `num_tokens_from_texts` adds
+        if self.summary_lengths(n_tokens)[1] + 7 < self.min_summary_tokens:
+            return "too short"
+        if n_tokens < self.paywall_max_tokens and PAYWALL.search(content):
+            return "paywall teaser"
+        return None
+
+    def summarize_batch(
+        self,
+        contents,
+        summarizer,
+        n_tokens: Optional[List[int]] = None,
+        long_form: bool = True,
+    ) -> List[str]:
+        """
+        Summarize `contents` with as few pipeline calls as possible.
+
+        Articles sharing the same `min_length`/`max_length` run together, sorted
+        by length so each batch pads as little as possible.
+
+        :param n_tokens: Tokenizer counts of `contents`, if already known.
+        :param long_form: Use long-form mode for articles over `long_form_tokens`.
+        :return: One summary per content, in input order.
+        """
+        if n_tokens is None:
+            n_tokens = [
+                len(encoding.tokens)
+                for encoding in self.tokenizer.encode_batch(contents)
+            ]
+        if long_form and self.long_form_tokens:
+            contents, n_tokens = self.map_long_form(contents, n_tokens, summarizer)
+        buckets = defaultdict(list)
+        for i, n in enumerate(n_tokens):
+            buckets[self.summary_lengths(n)].append(i)
+
+        summaries = [None] * len(contents)
+        for (min_length, max_length), indices in buckets.items():
+            indices.sort(key=lambda i: n_tokens[i])
+            outputs = summarizer(
+                [contents[i] for i in indices],
+                batch_size=min(len(indices), self.summary_batch_size),
+                min_length=min_length,
+                max_length=max_length,
+                **self.summary_params,
+            )
+            for i, output in zip(indices, outputs):
+                # pipelines nest single-sequence outputs in a list for some inputs
+                output = output[0] if isinstance(output, list) else output
+                summaries[i] = output["summary_text"]
+        return summaries
+
+    def map_long_form(self, contents, n_tokens, summarizer):
+        """
+        Long-form map step: replace each long article by its joined chunk summaries.
+
+        Chunks are generated lazily and summarized `summary_batch_size` at a
+        time, so memory stays bounded by one batch whatever the article length.
+        The caller's regular pass over the result is the reduce step.
+
+        :return: Contents and token counts with the long articles replaced.
+        """
+        long_articles = [
+            i for i, n in enumerate(n_tokens) if n > self.long_form_tokens
+        ]
+        if not long_articles:
+            return contents, n_tokens
+
+        contents, n_tokens = list(contents), list(n_tokens)
+        chunks = (
+            (i, chunk)
+            for i in long_articles
+            for chunk in self.split_text_into_chunks(
+                contents[i], max_tokens=min(self.chunk_tokens, self.long_form_tokens)
+            )
+        )
+        partial = defaultdict(list)
+        while True:
+            batch = list(itertools.islice(chunks, self.summary_batch_size))
+            if not batch:
+                break
+            summaries = self.summarize_batch(
+                [chunk for _, chunk in batch], summarizer, long_form=False
+            )
+            for (i, _), summary in zip(batch, summaries):
+                partial[i].append(summary)
+
+        encodings = self.tokenizer.encode_batch(
+            [" ".join(partial[i]) for i in long_articles]
+        )
+        for i, encoding in zip(long_articles, encodings):
+            contents[i] = " ".join(partial[i])
+            n_tokens[i] = len(encoding.tokens)
+        self.logger.info(
+            f"long-form: {len(long_articles)} articles mapped to chunk summaries"
+        )
+        return contents, n_tokens
+
+    @staticmethod
+    def summarizer_name(summarizer) -> str:
+        model = getattr(summarizer, "model", None)
+        name = getattr(model, "name_or_path", None) or type(summarizer).__name__
+        backend = getattr(summarizer, "backend", "fp32")
+        return name if backend == "fp32" else f"{name}:{backend}"
+
+    def summarize_cached(
+        self,
+        contents,
+        summarizer,
+        db: pymongo.database.Database,
+        n_tokens: Optional[List[int]] = None,
+    ) -> Tuple[List[str], int]:
+        """
+        Like `summarize_batch`, but reuse summaries stored by earlier keywords or runs.
+
+        :return: One summary per content, in input order, and how many were generated.
+        """
+        model = self.summarizer_name(summarizer)
+        # the length rule of `summary_lengths` is part of the configuration too
+        params = {**self.summary_params, "lengths": "min(n/3, 200), min(n/2, 250)"}
+        if self.long_form_tokens:
+            params["long_form"] = [self.long_form_tokens, self.chunk_tokens]
+        keys = [self.summary_cache.key(content, model, params) for content in contents]
+        cached = self.summary_cache.get_many(db, keys)
+
+        missing = [i for i, key in enumerate(keys) if key not in cached]
+        if missing:
+            fresh = self.summarize_batch(
+                [contents[i] for i in missing],
+                summarizer,
+                n_tokens=[n_tokens[i] for i in missing] if n_tokens else None,
+            )
+            for i, summary in zip(missing, fresh):
+                cached[keys[i]] = summary
+                self.writers.get(db.article_summaries).add(
+                    self.summary_cache.operation(keys[i], summary, model), key=keys[i]
+                )
+        return [cached[key] for key in keys], len(missing)
+
     def process(
         self,
         articles,
@@ -54,48 +251,98 @@ class DocumentProcessor:
         max_articles: int = 8,
         email: Optional[str] = None,
     ):
+        """
+        Summarize the first `max_articles` articles whose summaries are long enough.
+
+        Articles are summarized in rank order, one window at a time. Each window
+        holds as many articles as are still needed, so no more articles are
+        summarized than if they were run one by one. Articles that `screen`
+        predicts will be rejected are skipped before inference and the window
+        looks further down the ranking instead. Summaries already in the
+        summary cache are reused instead of running the model again.
+        """
+        articles = list(articles)
         res = {}
         titles = []
         n_articles = 0
-        for article in articles:
-            # chunks = self.split_text_into_chunks(article["content"])
-            # summary_maps = [summarizer(chunk)[0]["summary_text"] for chunk in chunks]
-            # summary = ", ".join(summary_maps)
-            tokens = self.tokenizer.encode(article["content"])
-            summary = summarizer(
-                article["content"],
-                truncation="only_first",
-                min_length=int(min(len(tokens.tokens) / 3, 200)),
-                max_length=int(min(len(tokens.tokens) / 2, 250)),
-                length_penalty=2,
-                early_stopping=True,
-                num_beams=1,
-                # no_repeat_ngram_size=3,
-            )[0]["summary_text"]
-
-            n_tokens = self.openai_summarizer.num_tokens_from_messages(
-                messages=[{"content": summary}]
-            )
-            self.logger.info(
-                f"""summarized length: n:{n_articles} | n_tokens:{n_tokens} | email:{email} | url:{article['url']}"""
+        n_summarized = 0
+        n_reused = 0
+        n_screened = 0
+        inference_seconds = 0.0
+        position = 0
+        while n_articles < max_articles and position < len(articles):
+            needed = max_articles - n_articles
+            window, window_tokens = [], []
+            while len(window) < needed and position < len(articles):
+                candidates = articles[position : position + needed - len(window)]
+                position += len(candidates)
+                encodings = self.tokenizer.encode_batch(
+                    [article["content"] for article in candidates]
+                )
+                for article, encoding in zip(candidates, encodings):
+                    reason = self.screen(article["content"], len(encoding.tokens))
+                    if reason:
+                        n_screened += 1
+                        self.logger.info(
+                            f"skipping before inference, {reason} | n_tokens:{len(encoding.tokens)} | email:{email} | url:{article['url']}"
+                        )
+                        continue
+                    window.append(article)
+                    window_tokens.append(len(encoding.tokens))
+            if not window:
+                break
+
+            start = time.perf_counter()
+            summaries, n_generated = self.summarize_cached(
+                [article["content"] for article in window],
+                summarizer,
+                db=db,
+                n_tokens=window_tokens,
             )
+            inference_seconds += time.perf_counter() - start
+            n_summarized += n_generated
+            n_reused += len(window) - n_generated
+            token_counts = self.openai_summarizer.num_tokens_from_texts(summaries)
 
-            if n_tokens < 100:
+            for article, summary, n_tokens in zip(window, summaries, token_counts):
                 self.logger.info(
-                    f"skipping, insufficient tokens | n_tokens:{n_tokens} | email:{email} | url:{article['url']}"
+                    f"""summarized length: n:{n_articles} | n_tokens:{n_tokens} | email:{email} | url:{article['url']}"""
                 )
-                continue
 
-            res[article["url"]] = summary
-            titles.append(article["title"])
-            db.articles.update_one(
-                {"_id": article["_id"]}, {"$set": {"summary": summary}}
-            )
-            n_articles += 1
+                if n_tokens < self.min_summary_tokens:
+                    self.logger.info(
+                        f"skipping, insufficient tokens | n_tokens:{n_tokens} | email:{email} | url:{article['url']}"
+                    )
+                    continue
 
-            if n_articles >= max_articles:
-                break
+                res[article["url"]] = summary
+                titles.append(article["title"])
+                self.writers.get(db.articles).add(
+                    UpdateOne({"_id": article["_id"]}, {"$set": {"summary": summary}}),
+                    key=article["url"],
+                )
+                n_articles += 1
+
+        if n_summarized:
+            self.seconds_per_summary = inference_seconds / n_summarized
+            self.logger.info(
+                f"summarized {n_summarized} articles in {inference_seconds:.1f}s | {n_summarized / max(inference_seconds, 1e-9):.2f} articles/s | email:{email}"
+            )
+        if n_screened:
+            seconds_per_summary = getattr(self, "seconds_per_summary", None)
+            saved = (
+                f"~{n_screened * seconds_per_summary:.1f}s of inference saved"
+                if seconds_per_summary
+                else "inference time saved unknown until an article is summarized"
+            )
+            self.logger.info(
+                f"pre-filter skipped {n_screened} articles | {saved} | email:{email}"
+            )
+        if n_reused:
+            self.logger.info(f"reused {n_reused} cached summaries | email:{email}")
 
+        self.writers.get(db.articles).flush()
+        self.writers.get(db.article_summaries).flush()
         urls = list(res.keys())
 
         if email:
@@ -4,7 +4,6 @@ import re
 from dataclasses import dataclass
 
 import openai
-import tiktoken
 from transformers import pipeline
 
 from tailoredscoop import openai_api, utils
@@ -21,41 +20,39 @@ class OpenaiSummarizer:
 
     def num_tokens_from_messages(self, messages, model="gpt-3.5-turbo-0301"):
         """Returns the number of tokens used by a list of messages."""
-        try:
-            encoding = tiktoken.encoding_for_model(model)
-        except KeyError:
-            self.logger.error("Warning: model not found. Using cl100k_base encoding.")
-            encoding = tiktoken.get_encoding("cl100k_base")
-        if model == "gpt-3.5-turbo":
-            return self.num_tokens_from_messages(messages, model="gpt-3.5-turbo-0301")
-        elif model == "gpt-4":
-            return self.num_tokens_from_messages(messages, model="gpt-4-0314")
-        elif model == "gpt-3.5-turbo-0301":
-            tokens_per_message = (
-                4  # every message follows <|start|>{role/name}\n{content}<|end|>\n
-            )
-            tokens_per_name = -1  # if there's a name, the role is omitted
-        elif model == "gpt-4-0314":
-            tokens_per_message = 3
-            tokens_per_name = 1
-        else:
-            raise NotImplementedError(
-                f"""num_tokens_from_messages() is not implemented for model {model}. See https://github.com/openai/openai-python/blob/main/chatml.md for information on how messages are converted to tokens."""
-            )
-        num_tokens = 0
-        for message in messages:
-            num_tokens += tokens_per_message
-            for key, value in message.items():
-                num_tokens += len(encoding.encode(value))
-                if key == "name":
-                    num_tokens += tokens_per_name
-        num_tokens += 3  # every reply is primed with <|start|>assistant<|message|>
-        return num_tokens
+        return openai_api.num_tokens_from_messages(messages, model=model)
+
+    def num_tokens_from_texts(self, texts, model="gpt-3.5-turbo-0301"):
+        """Returns the token count of each text sent as a single message."""
+        return openai_api.num_tokens_from_texts(texts, model=model)
 
     def get_openai_summary(self, data) -> str:
         # single param for asyncio
-        res = data["res"]
+        messages, num_tokens = self.openai_summary_messages(data["res"])
+        response = self.openai_api.create(
+            model="gpt-3.5-turbo",
+            messages=messages,
+            temperature=0.2,
+            max_tokens=4096 - num_tokens,
+        )
+        return self.clean_openai_summary(response)
+
+    async def aget_openai_summary(self, data) -> str:
+        messages, num_tokens = self.openai_summary_messages(data["res"])
+        response = await self.openai_api.acreate(
+            model="gpt-3.5-turbo",
+            messages=messages,
+            temperature=0.2,
+            max_tokens=4096 - num_tokens,
+        )
+        return self.clean_openai_summary(response)
+
+    @staticmethod
+    def clean_openai_summary(response) -> str:
+        summary = response["choices"][0]["message"]["content"]
+        return summary.replace("🔫", "📰")
 
+    def openai_summary_messages(self, res):
         today_news = "; ".join(res.values())
 
         messages = [
@@ -129,19 +126,33 @@ class OpenaiSummarizer:
                 f"Number of Tokens of Hugging Face Summaries is too Large for Open AI to Summarize | n_tokens = {num_tokens}"
             )
 
+        return messages, num_tokens
+
+    def get_subject(self, summary):
         response = self.openai_api.create(
             model="gpt-3.5-turbo",
-            messages=messages,
-            temperature=0.2,
-            max_tokens=4096 - num_tokens,
+            messages=self.subject_messages(summary),
+            temperature=0.8,
+            max_tokens=100,
         )
+        return self.clean_subject(response)
 
-        summary = response["choices"][0]["message"]["content"]
-        summary = summary.replace("🔫", "📰")
+    async def aget_subject(self, summary):
+        response = await self.openai_api.acreate(
+            model="gpt-3.5-turbo",
+            messages=self.subject_messages(summary),
+            temperature=0.8,
+            max_tokens=100,
+        )
+        return self.clean_subject(response)
 
-        return summary
+    @staticmethod
+    def clean_subject(response):
+        subject = response["choices"][0]["message"]["content"]
+        return subject.replace("🔫", "📰")
 
-    def get_subject(self, summary):
+    @staticmethod
+    def subject_messages(summary):
         messages = [
             {
                 "role": "system",
@@ -161,13 +172,7 @@ class OpenaiSummarizer:
             },
             {"role": "user", "content": f"Summary: {summary}. Subject:"},
         ]
-
-        response = self.openai_api.create(
-            model="gpt-3.5-turbo", messages=messages, temperature=0.8, max_tokens=100
-        )
-
-        subject = response["choices"][0]["message"]["content"]
-        return subject.replace("🔫", "📰")
+        return messages
 
     # def get_url_headlines(self, urls):
     #     messages = [
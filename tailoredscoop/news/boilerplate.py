@@ -0,0 +1,177 @@
+import collections
+import datetime
+import hashlib
+import logging
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Set
+
+import pymongo
+from pymongo import UpdateOne
+
+from tailoredscoop.db.writer import BulkWriter
+
+_DIGITS = re.compile(r"\d+")
+
+
+def fingerprint(paragraph: str) -> str:
+    """Hash of a paragraph with case, digits and whitespace normalized."""
+    normalized = " ".join(_DIGITS.sub("0", paragraph.lower()).split())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class BoilerplateFilter:
+    """
+    Learns paragraphs a domain repeats across pages (newsletter sign-ups, "read
+    more" blurbs, copyright lines) and drops them from extracted articles.
+
+    Paragraph fingerprints are counted once per page in `db.boilerplate`, with
+    the counted pages kept in `db.boilerplate_pages`; a paragraph seen on at
+    least `min_pages` pages of the same domain is boilerplate. Both are loaded
+    once per domain; fingerprints and pages not seen within `ttl` are ignored,
+    and deleted by `prune` the first time a database is used.
+
+    :param min_pages: Pages of a domain a paragraph must appear on to be dropped.
+    :param ttl: How long a fingerprint or counted page is remembered.
+    """
+
+    min_pages: int = 3
+    ttl: datetime.timedelta = datetime.timedelta(days=30)
+
+    def __post_init__(self):
+        self.logger = logging.getLogger("tailoredscoops.boilerplate")
+        self.counts: Dict[str, collections.Counter] = {}
+        self.seen_urls: Dict[str, Set[str]] = {}
+        self.pruned: Set[int] = set()
+        self.removed: Dict[str, collections.Counter] = collections.defaultdict(
+            collections.Counter
+        )
+
+    def prune(self, db: pymongo.database.Database) -> None:
+        """Delete fingerprints and counted pages not seen within `ttl`."""
+        since = datetime.datetime.now() - self.ttl
+        for collection in (db.boilerplate, db.boilerplate_pages):
+            collection.delete_many({"seen_at": {"$lt": since}})
+
+    def domain_counts(
+        self, db: pymongo.database.Database, domain: str
+    ) -> collections.Counter:
+        if id(db) not in self.pruned:
+            self.pruned.add(id(db))
+            self.prune(db)
+        if domain not in self.counts:
+            since = datetime.datetime.now() - self.ttl
+            self.counts[domain] = collections.Counter(
+                {
+                    stored["fingerprint"]: stored["pages"]
+                    for stored in db.boilerplate.find(
+                        {"domain": domain, "seen_at": {"$gte": since}},
+                        {"fingerprint": 1, "pages": 1},
+                    )
+                }
+            )
+        return self.counts[domain]
+
+    def first_visit(
+        self,
+        db: pymongo.database.Database,
+        domain: str,
+        url: str,
+        writer: Optional[BulkWriter] = None,
+    ) -> bool:
+        """
+        Record `url` as counted; False if it already was.
+
+        :param writer: Bulk writer for `db.boilerplate_pages`; writes directly
+            if None.
+        """
+        if domain not in self.seen_urls:
+            since = datetime.datetime.now() - self.ttl
+            self.seen_urls[domain] = {
+                stored["url"]
+                for stored in db.boilerplate_pages.find(
+                    {"domain": domain, "seen_at": {"$gte": since}}, {"url": 1}
+                )
+            }
+        if url in self.seen_urls[domain]:
+            return False
+        self.seen_urls[domain].add(url)
+        operation = UpdateOne(
+            {"domain": domain, "url": url},
+            {"$setOnInsert": {"seen_at": datetime.datetime.now()}},
+            upsert=True,
+        )
+        if writer is not None:
+            writer.add(operation, key=url)
+        else:
+            db.boilerplate_pages.bulk_write([operation])
+        return True
+
+    def clean(
+        self,
+        db: pymongo.database.Database,
+        domain: str,
+        url: str,
+        content: str,
+        count_tokens: Optional[Callable[[str], int]] = None,
+        writer: Optional[BulkWriter] = None,
+        page_writer: Optional[BulkWriter] = None,
+    ) -> str:
+        """
+        Record the paragraphs of a page and return its content without boilerplate.
+
+        :param domain: Publisher domain the page belongs to.
+        :param url: Page URL; a page is only counted once.
+        :param content: Extracted text, one paragraph per line.
+        :param count_tokens: Tokenizer count used for the removal stats.
+        :param writer: Bulk writer for `db.boilerplate`; writes directly if None.
+        :param page_writer: Bulk writer for `db.boilerplate_pages`; writes
+            directly if None.
+        :return: The content without boilerplate paragraphs, or the content
+            unchanged if every paragraph would be dropped.
+        """
+        paragraphs = content.split("\n")
+        fingerprints = [fingerprint(p) if p.strip() else None for p in paragraphs]
+        counts = self.domain_counts(db, domain)
+
+        if self.first_visit(db, domain, url, writer=page_writer):
+            page = {fp for fp in fingerprints if fp}
+            counts.update(page)
+            now = datetime.datetime.now()
+            operations = [
+                UpdateOne(
+                    {"domain": domain, "fingerprint": fp},
+                    {"$inc": {"pages": 1}, "$set": {"seen_at": now}},
+                    upsert=True,
+                )
+                for fp in page
+            ]
+            if writer is not None:
+                for operation in operations:
+                    writer.add(operation, key=domain)
+            elif operations:
+                db.boilerplate.bulk_write(operations, ordered=False)
+
+        kept, dropped = [], []
+        for paragraph, fp in zip(paragraphs, fingerprints):
+            if fp and counts[fp] >= self.min_pages:
+                dropped.append(paragraph)
+            else:
+                kept.append(paragraph)
+        if not dropped or not any(p.strip() for p in kept):
+            return content
+
+        cleaned = "\n".join(kept)
+        removed = "\n".join(dropped)
+        stats = self.removed[domain]
+        stats["pages"] += 1
+        stats["paragraphs"] += len(dropped)
+        stats["bytes"] += len(content.encode("utf-8")) - len(cleaned.encode("utf-8"))
+        if count_tokens is not None:
+            stats["tokens"] += count_tokens(removed)
+        return cleaned
+
+    def stats(self) -> dict:
+        """Pages cleaned, paragraphs, bytes and tokens removed, per domain."""
+        return {domain: dict(stats) for domain, stats in self.removed.items()}
@@ -0,0 +1,125 @@
+import datetime
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set
+
+import pymongo
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+@dataclass
+class Circuit:
+    status: str = CLOSED
+    failures: int = 0
+    opened_at: float = 0.0
+
+
+@dataclass
+class CircuitBreaker:
+    """
+    Per-domain circuit breaker for article sources.
+
+    A domain's circuit opens after `failure_threshold` consecutive failures and
+    rejects requests for `cooldown` seconds. It then goes half-open and lets a
+    single probe through: a success closes it, a failure opens it again. A probe
+    that never reports back is replaced after another `cooldown`.
+
+    :param failure_threshold: Consecutive failures that open a circuit.
+    :param cooldown: Seconds an open circuit waits before allowing a probe.
+    """
+
+    failure_threshold: int = 5
+    cooldown: float = 600
+    clock: Callable[[], float] = time.monotonic
+    circuits: Dict[str, Circuit] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self.logger = logging.getLogger("tailoredscoops.breaker")
+
+    def state(self, domain: str) -> str:
+        circuit = self.circuits.get(domain)
+        return circuit.status if circuit else CLOSED
+
+    def allow(self, domain: str) -> bool:
+        """Whether a request to `domain` may be issued now."""
+        circuit = self.circuits.get(domain)
+        if circuit is None or circuit.status == CLOSED:
+            return True
+        now = self.clock()
+        if now - circuit.opened_at < self.cooldown:
+            return False
+        # open and cooled down, or a half-open probe that never reported back
+        circuit.status = HALF_OPEN
+        circuit.opened_at = now
+        return True
+
+    def record_success(self, domain: str) -> None:
+        circuit = self.circuits.pop(domain, None)
+        if circuit and circuit.status != CLOSED:
+            self.logger.info(f"circuit closed: {domain}")
+
+    def record_failure(self, domain: str) -> None:
+        circuit = self.circuits.setdefault(domain, Circuit())
+        circuit.failures += 1
+        if circuit.status == HALF_OPEN or circuit.failures >= self.failure_threshold:
+            if circuit.status != OPEN:
+                self.logger.info(f"circuit opened: {domain} | {circuit.failures}")
+            circuit.status = OPEN
+            circuit.opened_at = self.clock()
+
+
+@dataclass
+class FailureCache:
+    """
+    TTL-based negative cache over `db.article_download_fails`.
+
+    :param ttl: How long a failed download is remembered.
+    """
+
+    ttl: datetime.timedelta = datetime.timedelta(hours=12)
+
+    def record(
+        self, db: pymongo.database.Database, url: str, link: Optional[str] = None
+    ) -> None:
+        db.article_download_fails.update_one(
+            {"url": url},
+            {
+                "$set": {
+                    "url": url,
+                    "link": link or url,
+                    "failed_at": datetime.datetime.now(),
+                },
+                "$inc": {"count": 1},
+            },
+            upsert=True,
+        )
+
+    def is_failed(self, db: pymongo.database.Database, link: str) -> bool:
+        """Whether `link` (or the URL it redirected to) failed within the TTL."""
+        return (
+            db.article_download_fails.find_one(
+                {
+                    "$or": [{"link": link}, {"url": link}],
+                    "failed_at": {"$gte": datetime.datetime.now() - self.ttl},
+                },
+                {"_id": 1},
+            )
+            is not None
+        )
+
+    def failed_links(self, db: pymongo.database.Database, links: List[str]) -> Set[str]:
+        """Those of `links` that failed within the TTL, in a single query."""
+        failed = set()
+        for stored in db.article_download_fails.find(
+            {
+                "$or": [{"link": {"$in": links}}, {"url": {"$in": links}}],
+                "failed_at": {"$gte": datetime.datetime.now() - self.ttl},
+            },
+            {"_id": 0, "link": 1, "url": 1},
+        ):
+            failed.update([stored.get("link"), stored.get("url")])
+        return failed & set(links)
@@ -0,0 +1,275 @@
+import asyncio
+import datetime
+import logging
+import multiprocessing
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import lxml.html
+import pymongo
+from bs4 import BeautifulSoup, SoupStrainer
+from lxml import etree
+
+
+def _article_class(x):
+    return x and "article" in x
+
+
+def extract_bs4(html: str) -> Optional[str]:
+    """
+    Reference extractor: full BeautifulSoup tree, `<article>` tags or else any
+    element whose class mentions "article", joined `<p>` text.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    article_tags = soup.find_all("article")
+    if not article_tags:
+        article_tags = soup.find_all(class_=_article_class)
+    if not article_tags:
+        return None
+    paragraphs = [p for article_tag in article_tags for p in article_tag.find_all("p")]
+    return "\n".join(par.text for par in paragraphs)
+
+
+def extract_strained(html: str) -> Optional[str]:
+    """
+    Same rules as `extract_bs4`, but only the matching subtrees are built.
+    """
+    soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer("article"))
+    article_tags = soup.find_all("article")
+    if not article_tags:
+        soup = BeautifulSoup(
+            html, "html.parser", parse_only=SoupStrainer(class_=_article_class)
+        )
+        article_tags = soup.find_all(class_=_article_class)
+    if not article_tags:
+        return None
+    paragraphs = [p for article_tag in article_tags for p in article_tag.find_all("p")]
+    return "\n".join(par.text for par in paragraphs)
+
+
+def _paragraph_text(elements) -> str:
+    return "\n".join(
+        p.text_content() for element in elements for p in element.iter("p")
+    )
+
+
+def _parse_lxml(html: str):
+    try:
+        return lxml.html.document_fromstring(html)
+    except (etree.ParserError, ValueError):
+        return None
+
+
+def _extract_tree(tree) -> Optional[str]:
+    article_tags = tree.xpath("//article")
+    if not article_tags:
+        article_tags = tree.xpath("//*[contains(@class, 'article')]")
+    if not article_tags:
+        return None
+    return _paragraph_text(article_tags)
+
+
+def extract_lxml(html: str) -> Optional[str]:
+    """
+    Same rules as `extract_bs4` using libxml2's HTML parser and XPath.
+
+    Falls back to `extract_bs4` for documents lxml refuses to parse.
+    """
+    tree = _parse_lxml(html)
+    if tree is None:
+        return extract_bs4(html)
+    return _extract_tree(tree)
+
+
+_SAFE_TOKEN = re.compile(r"^[\w-]+$")
+
+
+def rule_xpath(rule: str) -> str:
+    """
+    XPath for a learned rule: "itemprop:<value>", "article" or "class:<token>".
+    """
+    kind, _, value = rule.partition(":")
+    if kind == "itemprop":
+        return f"//*[@itemprop='{value}']"
+    if kind == "class":
+        return f"//*[contains(concat(' ', normalize-space(@class), ' '), ' {value} ')]"
+    return "//article"
+
+
+def learn_rule(tree, share: float = 0.8) -> Optional[str]:
+    """
+    Pick the most specific selector that captures most of the page's paragraph text.
+
+    Candidates are tried in order (`itemprop=articleBody`, `<article>`, then each
+    class token containing "article"); the first whose paragraph text is at
+    least `share` of the best candidate's wins.
+    """
+    candidates = []
+    if tree.xpath("//*[@itemprop='articleBody']"):
+        candidates.append("itemprop:articleBody")
+    if tree.xpath("//article"):
+        candidates.append("article")
+    tokens = {
+        token
+        for classes in tree.xpath("//@class[contains(., 'article')]")
+        for token in classes.split()
+        if "article" in token and _SAFE_TOKEN.match(token)
+    }
+    candidates += [f"class:{token}" for token in sorted(tokens)]
+
+    lengths = [len(_paragraph_text(tree.xpath(rule_xpath(x)))) for x in candidates]
+    if not lengths or max(lengths) == 0:
+        return None
+    best = max(lengths)
+    return next(x for x, n in zip(candidates, lengths) if n >= share * best)
+
+
+def extract_with_rule(
+    html: str, rule: Optional[str], min_chars: int = 500
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Extract with a learned per-domain rule, re-learning it when it under-delivers.
+
+    :param html: Page source.
+    :param rule: Rule learned from earlier pages of the domain, if any.
+    :param min_chars: Paragraph text below which the rule is considered stale.
+    :return: Extracted content (or None) and the rule to keep for the domain.
+    """
+    tree = _parse_lxml(html)
+    if tree is None:
+        return extract_bs4(html), rule
+
+    if rule:
+        content = _paragraph_text(tree.xpath(rule_xpath(rule)))
+        if len(content) >= min_chars:
+            return content, rule
+
+    content = _extract_tree(tree)
+    if content is None:
+        return None, rule
+    return content, learn_rule(tree) or rule
+
+
+ENGINES = {
+    "bs4": extract_bs4,
+    "strained": extract_strained,
+    "lxml": extract_lxml,
+}
+
+
+@dataclass
+class ArticleExtractor:
+    """
+    Runs an HTML extraction engine off the event loop.
+
+    Extraction runs on a worker thread pool (lxml parses without holding the
+    GIL) that lives as long as the process. With `processes`, workers are
+    spawned processes instead; they import the `__main__` module, so the entry
+    point needs an `if __name__ == "__main__":` guard. A process pool broken by
+    a dying worker is replaced on the next call.
+
+    :param engine: Name of the engine in `ENGINES`.
+    :param max_workers: Size of the worker pool; 0 extracts inline on the caller.
+    :param processes: Use a spawned process pool instead of threads.
+    :param min_chars: Text a learned rule must yield before it is re-learned.
+    """
+
+    engine: str = "lxml"
+    max_workers: int = 4
+    processes: bool = False
+    min_chars: int = 500
+
+    def __post_init__(self):
+        self.logger = logging.getLogger("tailoredscoops.extract")
+        if self.engine not in ENGINES:
+            raise ValueError(
+                f"unknown extraction engine {self.engine}; choose from {list(ENGINES)}"
+            )
+        self.executor = None
+
+    def get_executor(self) -> Executor:
+        if self.executor is None:
+            if self.processes:
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="extract"
+                )
+        return self.executor
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """Run `fn(*args)` on the pool, or inline when `max_workers` is 0."""
+        if self.max_workers == 0:
+            return fn(*args)
+        executor = self.get_executor()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                executor, fn, *args
+            )
+        except BrokenProcessPool:
+            self.logger.error("extraction worker died; replacing the pool")
+            if self.executor is executor:
+                self.executor = None
+                executor.shutdown(wait=False)
+            raise
+
+    async def extract(self, html: str) -> Optional[str]:
+        """
+        Extract the joined paragraph text of the article containers in `html`.
+
+        :param html: Page source.
+        :return: Extracted content, or None if no article container was found.
+        """
+        return await self.run(ENGINES[self.engine], html)
+
+    async def extract_with_rule(
+        self, html: str, rule: Optional[str]
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Like `extract`, but try the domain's learned rule first (lxml engine only).
+
+        :param html: Page source.
+        :param rule: Rule learned from earlier pages of the same domain.
+        :return: Extracted content and the (possibly re-learned) rule.
+        """
+        if self.engine != "lxml":
+            return await self.extract(html), rule
+        return await self.run(extract_with_rule, html, rule, self.min_chars)
+
+    def shutdown(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+
+@dataclass
+class ExtractionRules:
+    """
+    Per-domain extraction rules, cached in memory and persisted in
+    `db.extraction_rules`.
+    """
+
+    def __post_init__(self):
+        self.rules: Dict[str, Optional[str]] = {}
+
+    def get(self, db: pymongo.database.Database, domain: str) -> Optional[str]:
+        if domain not in self.rules:
+            stored = db.extraction_rules.find_one({"domain": domain})
+            self.rules[domain] = stored["rule"] if stored else None
+        return self.rules[domain]
+
+    def set(self, db: pymongo.database.Database, domain: str, rule: str) -> None:
+        if self.rules.get(domain) == rule:
+            return
+        self.rules[domain] = rule
+        db.extraction_rules.update_one(
+            {"domain": domain},
+            {"$set": {"rule": rule, "updated_at": datetime.datetime.now()}},
+            upsert=True,
+        )
@@ -0,0 +1,70 @@
+import datetime
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import pymongo
+
+
+@dataclass
+class FeedCache:
+    """
+    Conditional-GET cache for RSS feeds.
+
+    Raw feed bodies and their ETag/Last-Modified validators are stored in
+    `db.feed_cache` so a re-poll can be answered with a 304. Parsed entries are
+    also memoized in-process per validator, so a 304 skips parsing as well.
+    """
+
+    def __post_init__(self):
+        self.logger = logging.getLogger("tailoredscoops.feeds")
+        self.parsed: Dict[str, Tuple[Tuple[str, str], List[dict]]] = {}
+
+    @staticmethod
+    def get(db: pymongo.database.Database, url: str) -> Optional[dict]:
+        return db.feed_cache.find_one({"url": url}, {"_id": 0})
+
+    @staticmethod
+    def validators(cached: Optional[dict]) -> Tuple[str, str]:
+        if not cached:
+            return ("", "")
+        return (cached.get("etag") or "", cached.get("last_modified") or "")
+
+    def conditional_headers(self, cached: Optional[dict]) -> dict:
+        """Request headers that let the server answer 304 Not Modified."""
+        etag, last_modified = self.validators(cached)
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    @staticmethod
+    def store(db: pymongo.database.Database, url: str, body: str, headers) -> dict:
+        cached = {
+            "url": url,
+            "body": body,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "fetched_at": datetime.datetime.now(),
+        }
+        db.feed_cache.update_one({"url": url}, {"$set": cached}, upsert=True)
+        return cached
+
+    @staticmethod
+    def touch(db: pymongo.database.Database, url: str) -> None:
+        db.feed_cache.update_one(
+            {"url": url}, {"$set": {"fetched_at": datetime.datetime.now()}}
+        )
+
+    def get_parsed(self, url: str, cached: Optional[dict]) -> Optional[List[dict]]:
+        """Entries parsed earlier from the same version of the feed, if any."""
+        memo = self.parsed.get(url)
+        validators = self.validators(cached)
+        if memo is None or validators == ("", "") or memo[0] != validators:
+            return None
+        return memo[1]
+
+    def set_parsed(self, url: str, cached: dict, entries: List[dict]) -> None:
+        self.parsed[url] = (self.validators(cached), entries)
@@ -1,87 +1,215 @@
 import asyncio
+import collections
 import datetime
 import hashlib
 import json
 import logging
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
 from urllib.parse import quote
 
 import aiohttp
 import feedparser
 import pymongo
-from bs4 import BeautifulSoup
+from aiohttp.http_parser import HAS_BROTLI
+from pymongo import ReplaceOne
 from tokenizers import Tokenizer
 
 from tailoredscoop import utils
 from tailoredscoop.db.init import SetupMongoDB
+from tailoredscoop.db.memo import MemoStore
+from tailoredscoop.db.summary_cache import SummaryCache
+from tailoredscoop.db.writer import BulkWriters
 from tailoredscoop.documents.keywords import Keywords
 from tailoredscoop.documents.process import DocumentProcessor
 from tailoredscoop.documents.summarize import OpenaiSummarizer
+from tailoredscoop.news.boilerplate import BoilerplateFilter
+from tailoredscoop.news.breaker import CircuitBreaker, FailureCache
+from tailoredscoop.news.extract import ArticleExtractor, ExtractionRules
+from tailoredscoop.news.feeds import FeedCache
 from tailoredscoop.news.google_news.topics import GOOGLE_TOPICS
+from tailoredscoop.news.redirects import RedirectCache
+from tailoredscoop.news.scheduler import DownloadScheduler
+from tailoredscoop.news.stream import DownloadAborted, read_limited
 from tailoredscoop.openai_api import ChatCompletion
 
 _no_default = object()
 
 
 class RequestArticle:
+    """
+    Downloads articles over a single long-lived aiohttp session.
+
+    The session (and its connection pool) is created lazily inside the running
+    event loop and shared by every concurrent request, so connections, TLS
+    sessions and DNS lookups are reused across articles and subscribers.
+    Call `close()` once the loop is done with it.
+    """
+
+    connection_limit: int = 100
+    connection_limit_per_host: int = 8
+    dns_cache_ttl: int = 300
+    connect_timeout: float = 10
+    read_timeout: float = 15
+    total_timeout: float = 30
+    max_bytes: int = 2_000_000
+    # paragraph characters after which the rest of the page is not needed; a few
+    # times more than the ~1024 BART tokens summarized, to allow for page chrome
+    text_budget: int = 20_000
+    html_content_types = ("text/html", "application/xhtml+xml")
+    headers = {
+        "User-Agent": "python-requests/2.20.0",
+        "Accept-Language": "en-US,en;q=0.5",
+        "Accept-Encoding": "gzip, deflate, br" if HAS_BROTLI else "gzip, deflate",
+    }
+
     def __post_init__(self):
         self.logger = logging.getLogger("tailoredscoops.api")
 
-    async def request_with_header(self, url: str, timeout: int = 600) -> str:
+    def get_session(self) -> aiohttp.ClientSession:
+        """
+        Return the shared session, creating it for the running event loop if needed.
+
+        A new session is created when none exists, when it was closed, or when
+        it belongs to a previous event loop (e.g. a prior `asyncio.run` call).
+        """
+        loop = asyncio.get_running_loop()
+        session = getattr(self, "_session", None)
+        if (
+            session is None
+            or session.closed
+            or getattr(self, "_session_loop", None) is not loop
+        ):
+            connector = aiohttp.TCPConnector(
+                limit=self.connection_limit,
+                limit_per_host=self.connection_limit_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+                use_dns_cache=True,
+                enable_cleanup_closed=True,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector, headers=self.headers
+            )
+            self._session_loop = loop
+        return self._session
+
+    async def close(self) -> None:
+        """
+        Close the shared session and release its pooled connections.
+        """
+        session = getattr(self, "_session", None)
+        if session is not None and not session.closed:
+            if getattr(self, "_session_loop", None) is asyncio.get_running_loop():
+                await session.close()
+        self._session = None
+        self._session_loop = None
+
+    def count_abort(self, domain: str, reason: str) -> None:
+        """
+        Record an aborted download for `domain`.
         """
-        Send a GET request to the given URL with custom headers and return the response text.
+        self.download_aborts[domain][reason] += 1
+
+    async def request_with_header(
+        self,
+        url: str,
+        timeout: Optional[aiohttp.ClientTimeout] = None,
+        domain: Optional[str] = None,
+    ) -> Tuple[str, str]:
+        """
+        Stream the page at the given URL and return its (possibly partial) text.
+
+        The body is read in chunks under connect/read/total deadlines and is
+        abandoned once it exceeds `max_bytes` or contains enough paragraph text
+        to fill the summarizer's input window. Non-HTML responses are rejected
+        before the body is read.
 
         :param url: URL to send the request to.
-        :return: Response text from the request.
-        """
-        # headers = {
-        #     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
-        #     "Accept-Language": "en-US,en;q=0.5",
-        # }
-        headers = {
-            "User-Agent": "python-requests/2.20.0",
-            "Accept-Language": "en-US,en;q=0.5",
-        }
+        :param timeout: Overrides the default connect/read/total deadlines.
+        :param domain: Publisher domain that aborts are counted against.
+        :return: Response text and the final URL after redirects.
+        """
+        domain = domain or self.scheduler.domain_of(url)
+        timeout = timeout or aiohttp.ClientTimeout(
+            total=self.total_timeout,
+            connect=self.connect_timeout,
+            sock_read=self.read_timeout,
+        )
+        session = self.get_session()
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    url, headers=headers, timeout=timeout, allow_redirects=True
-                ) as response:
-                    return await response.text(), str(response.url)
+            async with session.get(
+                url, timeout=timeout, allow_redirects=True
+            ) as response:
+                content_type = response.headers.get("Content-Type", "")
+                mimetype = content_type.split(";")[0].strip().lower()
+                if mimetype and mimetype not in self.html_content_types:
+                    raise DownloadAborted("content-type", url)
+                if (response.content_length or 0) > self.max_bytes:
+                    raise DownloadAborted("content-length", url)
+
+                text, truncated = await read_limited(
+                    response, max_bytes=self.max_bytes, text_budget=self.text_budget
+                )
+                if truncated:
+                    self.count_abort(domain, "max-bytes")
+                return text, str(response.url)
+        except DownloadAborted as e:
+            self.count_abort(domain, e.reason)
+            raise
         except asyncio.TimeoutError:
-            self.logger.error(f"Request timed out after {timeout} seconds: {url}")
+            self.count_abort(domain, "timeout")
+            self.logger.error(f"Request timed out ({timeout}): {url}")
             raise
 
     async def extract_article_content(
-        self, url: str, source: str, kw: str
+        self,
+        url: str,
+        source: str,
+        kw: str,
+        domain: Optional[str] = None,
+        db: Optional[pymongo.database.Database] = None,
     ) -> Optional[str]:
         """
         Extract the article content from the given URL.
 
+        When `db` is given, the publisher's learned extraction rule is tried
+        first and re-learned if it yields too little text.
+
         :param url: URL of the article.
+        :param domain: Publisher domain used for per-domain scheduling.
+        :param db: MongoDB database holding the learned extraction rules.
         :return: Extracted content of the article or None if failed.
         """
-        ...
+        domain = domain or self.scheduler.domain_of(url)
         try:
-            response, redirect_url = await self.request_with_header(url)
+            async with self.scheduler.slot(domain, key=kw):
+                response, redirect_url = await self.request_with_header(
+                    url, domain=domain
+                )
         except Exception as e:
             self.logger.error(f"request failed: {kw} | {source} | {url} | {e}")
             return None, url
 
-        soup = BeautifulSoup(response, "html.parser")
-        article_tags = soup.find_all("article")
-        if not article_tags:
-            article_tags = soup.find_all(class_=lambda x: x and "article" in x)
-
-        if article_tags:
-            paragraphs = [
-                p for article_tag in article_tags for p in article_tag.find_all("p")
-            ]
-        else:
+        try:
+            if db is None:
+                content = await self.extractor.extract(response)
+            else:
+                page_domain = self.scheduler.domain_of(redirect_url)
+                rule = self.extraction_rules.get(db=db, domain=page_domain)
+                content, learned = await self.extractor.extract_with_rule(
+                    response, rule
+                )
+                if learned and learned != rule:
+                    self.logger.info(f"extraction rule | {page_domain} | {learned}")
+                    self.extraction_rules.set(db=db, domain=page_domain, rule=learned)
+        except Exception as e:
+            self.logger.error(
+                f"extraction failed: {kw} | {source} | {redirect_url} | {e}"
+            )
+            return None, url
+        if content is None:
             self.logger.error(f"soup parse failed: {kw} | {source} | {redirect_url}")
             return None, url
-        content = "\n".join(par.text for par in paragraphs)
         return content, redirect_url
 
 
@@ -96,6 +224,24 @@ class ProcessArticle:
         """
         return db.articles.find_one({"link": link}, {"_id": 0})
 
+    @staticmethod
+    def check_db_for_articles(links: List[str], db) -> Dict[str, dict]:
+        """
+        check database for already queried articles in a single query
+        """
+        return {
+            article["link"]: article
+            for article in db.articles.find({"link": {"$in": links}}, {"_id": 0})
+        }
+
+    @staticmethod
+    def source_domain(article: dict) -> str:
+        """
+        Publisher domain of a feed entry, known before following its link.
+        """
+        source = article.get("source") or {}
+        return DownloadScheduler.domain_of(source.get("href") or article["link"])
+
     def published_at(self, article):
         return datetime.datetime.strptime(
             article["published"], "%a, %d %b %Y %H:%M:%S %Z"
@@ -125,6 +271,9 @@ class ProcessArticle:
         """
         Process a single news article and store it in the database.
 
+        Known redirects are resolved from the link cache first, so an article
+        already stored under its publisher URL is returned without any request.
+
         :param article: News article data.
         :param url_hash: Hash of the URL used for query_id.
         :param db: MongoDB database instance.
@@ -135,24 +284,107 @@ class ProcessArticle:
 
         if stored_article:
             return stored_article
+        article = await self.download_article(
+            article=article, url_hash=url_hash, db=db, rank=rank, kw=kw
+        )
+        await self.drain_writers(db)
+        return article
+
+    async def drain_writers(self, db: pymongo.database.Database) -> None:
+        """
+        Wait for the writes queued while downloading articles.
+        """
+        for collection in (
+            db.articles,
+            db.link_redirects,
+            db.boilerplate,
+            db.boilerplate_pages,
+        ):
+            await self.writers.get(collection).drain()
+
+    async def download_article(
+        self,
+        article: dict,
+        url_hash: str,
+        db: pymongo.database.Database,
+        rank: int,
+        kw: str,
+        failed: Optional[Set[str]] = None,
+        stored_urls: Optional[Dict[str, dict]] = None,
+    ) -> Optional[dict]:
+        """
+        Download a news article not yet stored under its link and store it.
+
+        :param article: News article data.
+        :param url_hash: Hash of the URL used for query_id.
+        :param db: MongoDB database instance.
+        :param failed: Links that failed recently, looked up for the whole feed
+            by `download()`; checked against `db` if None.
+        :param stored_urls: Stored articles by URL, for the feed's known
+            redirects; looked up in `db` if None.
+        :return: article is processed successfully, None otherwise.
+        """
+        resolved = self.redirects.get(db=db, link=article["link"])
+        if resolved:
+            if stored_urls is None:
+                stored_article = db.articles.find_one({"url": resolved}, {"_id": 0})
+            else:
+                stored_article = stored_urls.get(resolved)
+            if stored_article:
+                return stored_article
+
+        domain = self.source_domain(article)
+        if failed is None:
+            recently_failed = self.download_failures.is_failed(
+                db=db, link=article["link"]
+            )
         else:
-            article_text, url = await self.extract_article_content(
-                url=article["link"], source=article["source"]["title"], kw=kw
+            recently_failed = article["link"] in failed
+        if recently_failed:
+            self.logger.info(f"skipping recently failed: {kw} | {article['link']}")
+            return None
+        if not self.circuit_breaker.allow(domain):
+            self.logger.info(f"skipping, circuit open: {kw} | {domain}")
+            return None
+
+        article_text, url = await self.extract_article_content(
+            url=resolved or article["link"],
+            source=article["source"]["title"],
+            kw=kw,
+            domain=domain,
+            db=db,
+        )
+        if not article_text:
+            self.circuit_breaker.record_failure(domain)
+            self.download_failures.record(db=db, url=url, link=article["link"])
+        else:
+            self.circuit_breaker.record_success(domain)
+            self.redirects.set(
+                db=db,
+                link=article["link"],
+                url=url,
+                writer=self.writers.get(db.link_redirects),
             )
-            if not article_text:
-                db.article_download_fails.update_one(
-                    {"url": url}, {"$set": {"url": url}}, upsert=True
-                )
-            else:
-                article = self.format_articles(
-                    url=url,
-                    article=article,
-                    article_text=article_text,
-                    url_hash=url_hash,
-                    rank=rank,
-                )
-                db.articles.replace_one({"url": url}, article, upsert=True)
-                return article
+            article_text = self.boilerplate.clean(
+                db=db,
+                domain=domain,
+                url=url,
+                content=article_text,
+                count_tokens=lambda text: len(self.tokenizer.encode(text).tokens),
+                writer=self.writers.get(db.boilerplate),
+                page_writer=self.writers.get(db.boilerplate_pages),
+            )
+            article = self.format_articles(
+                url=url,
+                article=article,
+                article_text=article_text,
+                url_hash=url_hash,
+                rank=rank,
+            )
+            self.writers.get(db.articles).add(
+                ReplaceOne({"url": url}, article, upsert=True), key=url
+            )
+            return article
 
 
 @dataclass
@@ -166,12 +398,26 @@ class NewsAPI(
     api_key: str = _no_default
     log: utils.Logger = utils.Logger()
     openai_api: ChatCompletion = ChatCompletion()
+    scheduler: DownloadScheduler = field(default_factory=DownloadScheduler)
+    feed_cache: FeedCache = field(default_factory=FeedCache)
+    extractor: ArticleExtractor = field(default_factory=ArticleExtractor)
+    extraction_rules: ExtractionRules = field(default_factory=ExtractionRules)
+    circuit_breaker: CircuitBreaker = field(default_factory=CircuitBreaker)
+    download_failures: FailureCache = field(default_factory=FailureCache)
+    redirects: RedirectCache = field(default_factory=RedirectCache)
+    keyword_deadline: float = 120.0
+    writers: BulkWriters = field(default_factory=BulkWriters)
+    keyword_memo: MemoStore = field(default_factory=MemoStore)
+    summary_cache: SummaryCache = field(default_factory=SummaryCache)
+    boilerplate: BoilerplateFilter = field(default_factory=BoilerplateFilter)
 
     def __post_init__(self):
         self.now = datetime.datetime.now()
         self.log.setup_logger()
         self.logger = logging.getLogger("tailoredscoops.newsapi")
         self.tokenizer = Tokenizer.from_pretrained("bert-base-uncased")
+        self.download_aborts = collections.defaultdict(collections.Counter)
+        self.feed_requests = utils.SingleFlight()
         self.openai_summarizer = OpenaiSummarizer(openai_api=self.openai_api)
 
     async def download(
@@ -180,28 +426,78 @@ class NewsAPI(
         url_hash: str,
         db: pymongo.database.Database,
         kw: str,
-    ) -> List[int]:
+    ) -> List[Optional[dict]]:
         """
         Download and process the given list of articles.
 
+        Links already stored, links that failed recently, known redirects and
+        the articles stored under them are each looked up with one `$in` query;
+        only the misses are downloaded.
+
         :param articles: List of articles.
         :param url_hash: Hash of the URL used for query_id.
         :param db: MongoDB database instance.
-        :return: List of processing results (article if success, 0 for failure).
+        :return: List of processing results (article if success, None for failure).
         """
-        tasks = []
+        stored = self.check_db_for_articles(
+            links=[article["link"] for article in articles], db=db
+        )
+        misses = [
+            (i, article)
+            for i, article in enumerate(articles)
+            if article["link"] not in stored
+        ]
+        self.logger.info(
+            f"stored articles: {len(articles) - len(misses)}/{len(articles)} | {kw}"
+        )
+        links = [article["link"] for _, article in misses]
+        failed = self.download_failures.failed_links(db=db, links=links)
+        self.redirects.preload(db=db, links=links)
+        resolved = [self.redirects.get(db=db, link=link) for link in links]
+        stored_urls = {
+            article["url"]: article
+            for article in db.articles.find(
+                {"url": {"$in": [url for url in resolved if url]}}, {"_id": 0}
+            )
+        }
 
-        for i, article in enumerate(articles):
-            tasks.append(
-                asyncio.ensure_future(
-                    self.process_article(
-                        article=article, url_hash=url_hash, db=db, rank=i, kw=kw
-                    )
+        downloaded = await asyncio.gather(
+            *[
+                self.download_article(
+                    article=article,
+                    url_hash=url_hash,
+                    db=db,
+                    rank=i,
+                    kw=kw,
+                    failed=failed,
+                    stored_urls=stored_urls,
                 )
-            )
+                for i, article in misses
+            ]
+        )
+        downloaded = {i: result for (i, _), result in zip(misses, downloaded)}
+        await self.drain_writers(db)
+
+        self.logger.info(f"download scheduler | {kw} | {self.scheduler.stats()}")
+        if self.download_aborts:
+            self.logger.info(f"download aborts | {dict(self.download_aborts)}")
+        if self.boilerplate.removed:
+            self.logger.info(f"boilerplate removed | {self.boilerplate.stats()}")
+        return [
+            downloaded[i] if i in downloaded else stored[article["link"]]
+            for i, article in enumerate(articles)
+        ]
 
-        completed, _ = await asyncio.wait(tasks, return_when=asyncio.ALL_COMPLETED)
-        return [task.result() for task in completed]
+    async def close(self) -> None:
+        """
+        Write out buffered database operations and close the shared session.
+
+        The extraction pool is kept for later event loops of the process.
+        """
+        if self.keyword_memo.stats():
+            self.logger.info(f"keyword memo | {self.keyword_memo.stats()}")
+        await self.writers.drain()
+        await super().close()
 
     def exclude_sources(self, articles):
         return [
@@ -215,26 +511,125 @@ class NewsAPI(
             (url + self.now.strftime("%Y-%m-%d")).encode()
         ).hexdigest()
 
+    async def request_feed(
+        self, db: pymongo.database.Database, url: str
+    ) -> List[dict]:
+        """
+        Fetch and parse an RSS feed without blocking the event loop.
+
+        The feed is requested over the shared session with the validators of the
+        cached copy, so an unchanged feed costs a 304. Parsing runs in the
+        default executor.
+
+        :param db: MongoDB database instance.
+        :param url: URL of the feed.
+        :return: Parsed feed entries.
+        """
+        cached = self.feed_cache.get(db=db, url=url)
+        async with self.get_session().get(
+            url, headers=self.feed_cache.conditional_headers(cached), timeout=60
+        ) as response:
+            if response.status == 304 and cached:
+                self.logger.info(f"feed not modified: {url}")
+                self.feed_cache.touch(db=db, url=url)
+                entries = self.feed_cache.get_parsed(url=url, cached=cached)
+                if entries is not None:
+                    return entries
+            else:
+                response.raise_for_status()
+                cached = self.feed_cache.store(
+                    db=db, url=url, body=await response.text(), headers=response.headers
+                )
+
+        loop = asyncio.get_running_loop()
+        feed = await loop.run_in_executor(None, feedparser.parse, cached["body"])
+        self.feed_cache.set_parsed(url=url, cached=cached, entries=feed.entries)
+        return feed.entries
+
     async def request_google(
-        self, db: pymongo.database.Database, url: str, kw: str
+        self,
+        db: pymongo.database.Database,
+        url: str,
+        kw: str,
+        entries: Optional[List[dict]] = None,
     ) -> List[dict]:
         """
         Request articles from Google News with the given URL and store them in the database.
 
+        Concurrent requests for the same feed share a single fetch.
+
+        :param db: MongoDB database instance.
+        :param url: URL to send the request to.
+        :param entries: Feed entries from `feed_entries`, if already requested.
+        :return: List of requested articles.
+        """
+        articles = await self.feed_requests.do(
+            self.get_hash(url=url),
+            self.fetch_google,
+            db=db,
+            url=url,
+            kw=kw,
+            entries=entries,
+        )
+        return list(articles)
+
+    async def feed_entries(self, db: pymongo.database.Database, url: str) -> List[dict]:
+        """
+        Entries of a Google News feed that will be downloaded.
+
+        :param db: MongoDB database instance.
+        :param url: URL of the feed.
+        :return: The top feed entries, without excluded sources.
+        """
+        articles = (await self.request_feed(db=db, url=url))[:30]
+        return self.exclude_sources(articles)[:18]
+
+    @staticmethod
+    def query_completed(db: pymongo.database.Database, url_hash: str) -> bool:
+        """
+        Whether every article of the feed was processed today.
+
+        Articles of a cancelled fetch still reach `db.articles`, so the marker
+        in `db.queries` is only written once `download()` has finished.
+        """
+        return db.queries.find_one({"query_id": url_hash}, {"_id": 1}) is not None
+
+    async def fetch_google(
+        self,
+        db: pymongo.database.Database,
+        url: str,
+        kw: str,
+        entries: Optional[List[dict]] = None,
+    ) -> List[dict]:
+        """
+        Fetch a Google News feed (unless already done today) and download its articles.
+
         :param db: MongoDB database instance.
         :param url: URL to send the request to.
+        :param entries: Feed entries from `feed_entries`; requested if None.
         :return: List of requested articles.
         """
         url_hash = self.get_hash(url=url)
-        if db.articles.find_one({"query_id": url_hash}):
+        if self.query_completed(db=db, url_hash=url_hash):
             self.logger.info(f"Query already requested: {url_hash}")
             return list(db.articles.find({"query_id": url_hash}).sort("created_at", -1))
 
-        articles = feedparser.parse(url).entries[:30]
-        articles = self.exclude_sources(articles)[:18]
-
-        if articles:
-            await self.download(articles, url_hash, db, kw)
+        if entries is None:
+            entries = await self.feed_entries(db=db, url=url)
+
+        if entries:
+            await self.download(entries, url_hash, db, kw)
+            db.queries.update_one(
+                {"query_id": url_hash},
+                {
+                    "$set": {
+                        "url": url,
+                        "kw": kw,
+                        "completed_at": datetime.datetime.now(),
+                    }
+                },
+                upsert=True,
+            )
             return list(db.articles.find({"query_id": url_hash}).sort("created_at", -1))
         else:
             self.logger.error("no articles")
@@ -249,7 +644,7 @@ class NewsAPI(
             )
 
     async def query_topic(self, query, db):
-        new_q = self.get_topic(kw=query)
+        new_q = await self.aget_topic(query, db=db)
         if len(new_q) == 0:
             return []
         url = self.create_url("OR".join([f'"{x.strip()}"' for x in new_q.split(",")]))
@@ -258,7 +653,7 @@ class NewsAPI(
         return articles
 
     async def query_alternate(self, query, db):
-        new_q = self.get_similar_keywords_from_gpt(query)
+        new_q = await self.aget_similar_keywords_from_gpt(query, db=db)
         if len(new_q) == 0:
             return []
         url = self.create_url("OR".join([f'"{x.strip()}"' for x in new_q.split(",")]))
@@ -273,24 +668,94 @@ class NewsAPI(
         Query news articles by given keywords.
 
         :param db: MongoDB database instance.
+        Comma-separated keywords are queried concurrently; results keep the
+        keyword order.
+
         :param q: Keywords to query news articles.
         :return: List of news articles
         """
-        results = []
-        for query in q.split(","):
-            query = query.lower()
-            url = self.create_url(query)
+        per_keyword = await asyncio.gather(
+            *[self.query_keyword(db=db, query=query) for query in q.split(",")]
+        )
+        return [article for articles in per_keyword for article in articles]
+
+    async def wait_for_articles(
+        self, task: Optional[asyncio.Future], deadline: float, query: str
+    ) -> List[dict]:
+        """
+        Result of a query task, or [] if it is missing, failed or misses the deadline.
+        """
+        if task is None:
+            return []
+        timeout = max(deadline - asyncio.get_running_loop().time(), 0)
+        done, _ = await asyncio.wait({task}, timeout=timeout)
+        if not done:
+            self.logger.error(f"keyword deadline exceeded | {query}")
+            return []
+        if task.exception() is not None:
+            self.logger.error(f"query failed | {query} | {task.exception()}")
+            return []
+        return task.result()
 
-            self.logger.info(f"query for [{query}]; url: {url}")
-            articles = await self.request_google(db=db, url=url, kw=query)
+    async def query_keyword(
+        self, db: pymongo.database.Database, query: str
+    ) -> List[dict]:
+        """
+        Query news articles for a single keyword, with fallbacks when sparse.
 
-            results += articles
-            if len(results) <= 6:
-                articles = await self.query_alternate(query=query, db=db)
-                results += articles
+        The feed is requested first. When it has 6 or fewer entries the keyword
+        cannot be filled from it, so the GPT-assisted fallbacks
+        (`query_alternate`, `query_topic`) start right away, alongside the
+        article downloads; otherwise they only start if the downloads return 6
+        or fewer articles. Results are combined in the same order as the
+        sequential chain, within `keyword_deadline`, and fallbacks that are not
+        needed are cancelled along with their downloads.
 
-            if len(results) <= 6:
-                articles = await self.query_topic(query=query, db=db)
-                results += articles
+        :param db: MongoDB database instance.
+        :param query: Keyword to query news articles.
+        :return: List of news articles
+        """
+        query = query.lower()
+        url = self.create_url(query)
+        deadline = asyncio.get_running_loop().time() + self.keyword_deadline
+
+        def start_fallbacks():
+            return [
+                asyncio.ensure_future(self.query_alternate(query=query, db=db)),
+                asyncio.ensure_future(self.query_topic(query=query, db=db)),
+            ]
+
+        self.logger.info(f"query for [{query}]; url: {url}")
+        tasks = []
+        try:
+            entries, fallbacks = None, []
+            url_hash = self.get_hash(url=url)
+            if not self.query_completed(db=db, url_hash=url_hash):
+                feed = self.feed_requests.do(
+                    ("feed", url_hash), self.feed_entries, db=db, url=url
+                )
+                tasks.append(asyncio.ensure_future(feed))
+                entries = await self.wait_for_articles(tasks[-1], deadline, query)
+                if len(entries) <= 6:
+                    fallbacks = start_fallbacks()
+                    tasks += fallbacks
 
-        return results
+            tasks.append(
+                asyncio.ensure_future(
+                    self.request_google(db=db, url=url, kw=query, entries=entries)
+                )
+            )
+            results = await self.wait_for_articles(tasks[-1], deadline, query)
+            if len(results) <= 6 and not fallbacks:
+                fallbacks = start_fallbacks()
+                tasks += fallbacks
+
+            for fallback in fallbacks:
+                if len(results) > 6:
+                    break
+                results += await self.wait_for_articles(fallback, deadline, query)
+            return results
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
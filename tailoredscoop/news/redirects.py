@@ -0,0 +1,72 @@
+import datetime
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+import pymongo
+from pymongo import UpdateOne
+
+from tailoredscoop.db.writer import BulkWriter
+
+
+@dataclass
+class RedirectCache:
+    """
+    Google News link -> publisher URL, cached in memory and in `db.link_redirects`.
+
+    Links known to have no stored redirect are remembered too, so a feed
+    preloaded with `preload` needs no further lookups.
+    """
+
+    resolved: Dict[str, str] = field(default_factory=dict)
+    unresolved: Set[str] = field(default_factory=set)
+
+    def preload(self, db: pymongo.database.Database, links: List[str]) -> None:
+        """Look up the redirects of `links` not cached yet in a single query."""
+        links = [
+            link
+            for link in links
+            if link not in self.resolved and link not in self.unresolved
+        ]
+        if not links:
+            return
+        for stored in db.link_redirects.find(
+            {"link": {"$in": links}}, {"_id": 0, "link": 1, "url": 1}
+        ):
+            self.resolved[stored["link"]] = stored["url"]
+        self.unresolved.update(link for link in links if link not in self.resolved)
+
+    def get(self, db: pymongo.database.Database, link: str) -> Optional[str]:
+        if link in self.unresolved:
+            return None
+        if link not in self.resolved:
+            stored = db.link_redirects.find_one({"link": link}, {"_id": 0, "url": 1})
+            if not stored:
+                return None
+            self.resolved[link] = stored["url"]
+        return self.resolved[link]
+
+    def set(
+        self,
+        db: pymongo.database.Database,
+        link: str,
+        url: str,
+        writer: Optional[BulkWriter] = None,
+    ) -> None:
+        """
+        Remember that `link` redirects to `url`.
+
+        :param writer: Bulk writer for `db.link_redirects`; writes directly if None.
+        """
+        if url == link or self.resolved.get(link) == url:
+            return
+        self.resolved[link] = url
+        self.unresolved.discard(link)
+        operation = UpdateOne(
+            {"link": link},
+            {"$set": {"url": url, "resolved_at": datetime.datetime.now()}},
+            upsert=True,
+        )
+        if writer is not None:
+            writer.add(operation, key=link)
+        else:
+            db.link_redirects.bulk_write([operation])
@@ -0,0 +1,153 @@
+import asyncio
+import collections
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Deque, Dict, Hashable, Optional
+from urllib.parse import urlparse
+
+
+class FairGate:
+    """
+    Capacity-limited gate that admits queued callers round-robin across keys.
+
+    Callers that share a key are served first-in first-out, but no key can
+    starve another: each time a slot frees up it goes to the head of the next
+    key's queue. Built on plain futures so it is not tied to a single event loop.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.in_flight = 0
+        self.waiters: "collections.OrderedDict[Hashable, Deque[asyncio.Future]]" = (
+            collections.OrderedDict()
+        )
+
+    @property
+    def queued(self) -> int:
+        return sum(len(queue) for queue in self.waiters.values())
+
+    async def acquire(self, key: Hashable = None) -> None:
+        if self.in_flight < self.capacity and not self.waiters:
+            self.in_flight += 1
+            return
+
+        fut = asyncio.get_running_loop().create_future()
+        self.waiters.setdefault(key, collections.deque()).append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # admitted right before the cancellation landed; pass the slot on
+                self.release()
+            else:
+                self._discard(key, fut)
+            raise
+
+    def _discard(self, key: Hashable, fut: asyncio.Future) -> None:
+        queue = self.waiters.get(key)
+        if queue is None:
+            return
+        try:
+            queue.remove(fut)
+        except ValueError:
+            pass
+        if not queue:
+            del self.waiters[key]
+
+    def release(self) -> None:
+        while self.waiters:
+            key, queue = next(iter(self.waiters.items()))
+            fut = queue.popleft()
+            if queue:
+                self.waiters.move_to_end(key)
+            else:
+                del self.waiters[key]
+            if not fut.done():
+                # hand the slot straight to the waiter; in_flight is unchanged
+                fut.set_result(None)
+                return
+        self.in_flight -= 1
+
+
+@dataclass
+class DownloadScheduler:
+    """
+    Bounds article downloads globally and per publisher domain.
+
+    :param max_in_flight: Maximum number of requests in flight across all domains.
+    :param max_per_domain: Maximum number of concurrent requests to one domain.
+    :param domain_interval: Minimum number of seconds between request starts to one domain.
+    """
+
+    max_in_flight: int = 32
+    max_per_domain: int = 4
+    domain_interval: float = 0.25
+
+    def __post_init__(self):
+        self.logger = logging.getLogger("tailoredscoops.scheduler")
+        self.gate = FairGate(self.max_in_flight)
+        self.domain_gates: Dict[str, FairGate] = {}
+        self.next_start: Dict[str, float] = {}
+        self.n_requests = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @staticmethod
+    def domain_of(url: Optional[str]) -> str:
+        """Return the lower-cased host of a URL (or the input if it has none)."""
+        if not url:
+            return ""
+        return urlparse(url).netloc.lower() or url.lower()
+
+    async def _throttle(self, domain: str) -> None:
+        now = time.monotonic()
+        start = max(now, self.next_start.get(domain, now))
+        self.next_start[domain] = start + self.domain_interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    @asynccontextmanager
+    async def slot(self, domain: str, key: Hashable = None):
+        """
+        Wait for permission to send one request to `domain`.
+
+        :param domain: Publisher domain the request is for.
+        :param key: Fairness key (e.g. the keyword); queued requests are admitted
+            round-robin across keys.
+        """
+        queued_at = time.monotonic()
+        domain_gate = self.domain_gates.setdefault(
+            domain, FairGate(self.max_per_domain)
+        )
+        await domain_gate.acquire(key)
+        try:
+            await self.gate.acquire(key)
+            try:
+                await self._throttle(domain)
+                wait = time.monotonic() - queued_at
+                self.n_requests += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+                yield
+            finally:
+                self.gate.release()
+        finally:
+            domain_gate.release()
+
+    def stats(self) -> dict:
+        """Current queue depth, in-flight count and wait time statistics."""
+        return {
+            "in_flight": self.gate.in_flight,
+            "queued": self.gate.queued
+            + sum(gate.queued for gate in self.domain_gates.values()),
+            "queued_by_domain": {
+                domain: gate.queued
+                for domain, gate in self.domain_gates.items()
+                if gate.queued
+            },
+            "requests": self.n_requests,
+            "mean_wait": self.total_wait / self.n_requests if self.n_requests else 0.0,
+            "max_wait": self.max_wait,
+        }
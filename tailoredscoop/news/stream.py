@@ -0,0 +1,84 @@
+import codecs
+import re
+from typing import Tuple
+
+import aiohttp
+
+
+class DownloadAborted(Exception):
+    """Raised when an article download is abandoned before completion."""
+
+    def __init__(self, reason: str, url: str):
+        super().__init__(f"download aborted ({reason}): {url}")
+        self.reason = reason
+        self.url = url
+
+
+class ParagraphMeter:
+    """
+    Incrementally counts the text inside `<p>` elements of a streamed HTML page.
+
+    Only a bounded tail of the stream is kept between chunks (enough to hold a
+    paragraph that straddles a chunk boundary), so memory stays flat however
+    large the page is. Unterminated paragraphs longer than the tail are not
+    counted, which only ever makes the download read further.
+    """
+
+    paragraph = re.compile(r"<p(?:\s[^>]*)?>(.*?)</p\s*>", re.S | re.I)
+    tag = re.compile(r"<[^>]*>")
+    max_tail = 32_768
+
+    def __init__(self):
+        self.tail = ""
+        self.chars = 0
+
+    def feed(self, text: str) -> int:
+        buffer = self.tail + text
+        end = 0
+        for match in self.paragraph.finditer(buffer):
+            self.chars += len(self.tag.sub("", match.group(1)).strip())
+            end = match.end()
+
+        rest = buffer[end:]
+        start = rest.lower().rfind("<p")
+        rest = rest[start:] if start >= 0 else rest[-2:]
+        self.tail = rest if len(rest) <= self.max_tail else rest[-2:]
+        return self.chars
+
+
+async def read_limited(
+    response: aiohttp.ClientResponse, max_bytes: int, text_budget: int
+) -> Tuple[str, bool]:
+    """
+    Stream and decode a response body, stopping early when possible.
+
+    Reading stops once `max_bytes` have been received or once the `<p>` text
+    seen so far reaches `text_budget` characters.
+
+    :param response: Response whose body has not been read yet.
+    :param max_bytes: Maximum number of body bytes to read.
+    :param text_budget: Paragraph characters after which the rest is not needed.
+    :return: Decoded (possibly partial) body, and whether `max_bytes` was hit.
+    """
+    try:
+        decoder = codecs.getincrementaldecoder(response.charset or "utf-8")(
+            errors="replace"
+        )
+    except LookupError:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    meter = ParagraphMeter()
+    parts = []
+    n_bytes = 0
+    truncated = False
+    async for chunk in response.content.iter_chunked(16_384):
+        n_bytes += len(chunk)
+        text = decoder.decode(chunk)
+        parts.append(text)
+        if n_bytes >= max_bytes:
+            truncated = True
+            break
+        if meter.feed(text) >= text_budget:
+            break
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts), truncated
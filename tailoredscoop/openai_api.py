@@ -1,35 +1,303 @@
+import asyncio
+import functools
 import logging
+import random
+import threading
 import time
+from collections import deque
 from dataclasses import dataclass
+from typing import Callable, Deque, List, Optional
 
 import openai
+import tiktoken
 
 from tailoredscoop import utils
 
+logger = logging.getLogger("tailoredscoops.openai_api")
+
+
+# model name -> snapshot whose message format it uses
+MODEL_ALIASES = {
+    "gpt-3.5-turbo": "gpt-3.5-turbo-0301",
+    "gpt-4": "gpt-4-0314",
+}
+
+# snapshot -> (tokens_per_message, tokens_per_name)
+MESSAGE_OVERHEAD = {
+    # every message follows <|start|>{role/name}\n{content}<|end|>\n;
+    # if there's a name, the role is omitted
+    "gpt-3.5-turbo-0301": (4, -1),
+    "gpt-4-0314": (3, 1),
+}
+
+
+@functools.lru_cache(maxsize=None)
+def get_encoding(model: str) -> tiktoken.Encoding:
+    """The tiktoken encoding for `model`, loaded once per model."""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        logger.error("Warning: model not found. Using cl100k_base encoding.")
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def num_tokens_from_messages(messages, model="gpt-3.5-turbo-0301"):
+    """Returns the number of tokens used by a list of messages."""
+    model = MODEL_ALIASES.get(model, model)
+    if model not in MESSAGE_OVERHEAD:
+        raise NotImplementedError(
+            f"""num_tokens_from_messages() is not implemented for model {model}. See https://github.com/openai/openai-python/blob/main/chatml.md for information on how messages are converted to tokens."""
+        )
+    tokens_per_message, tokens_per_name = MESSAGE_OVERHEAD[model]
+    encoding = get_encoding(model)
+    num_tokens = 0
+    for message in messages:
+        num_tokens += tokens_per_message
+        for key, value in message.items():
+            num_tokens += len(encoding.encode(value))
+            if key == "name":
+                num_tokens += tokens_per_name
+    num_tokens += 3  # every reply is primed with <|start|>assistant<|message|>
+    return num_tokens
+
+
+def num_tokens_from_texts(texts: List[str], model="gpt-3.5-turbo-0301") -> List[int]:
+    """
+    Token counts of many texts, each sent as the content of a single message.
+
+    Equivalent to `[num_tokens_from_messages([{"content": t}], model) for t in texts]`,
+    but the texts are encoded in one `encode_batch` call.
+    """
+    model = MODEL_ALIASES.get(model, model)
+    if model not in MESSAGE_OVERHEAD:
+        raise NotImplementedError(
+            f"num_tokens_from_texts() is not implemented for model {model}."
+        )
+    tokens_per_message, _ = MESSAGE_OVERHEAD[model]
+    encoded = get_encoding(model).encode_batch(list(texts))
+    return [tokens_per_message + len(tokens) + 3 for tokens in encoded]
+
+
+@dataclass
+class RateLimiter:
+    """
+    Token buckets for the account's requests-per-minute and tokens-per-minute caps.
+
+    Callers reserve one request and an estimate of the tokens they will use
+    (prompt tokens plus `max_tokens`) before calling the API, and settle the
+    reservation with the actual usage afterwards. Waiting callers are served
+    in arrival order, so a large request is not starved by smaller ones. The
+    buckets are shared across threads and event loops: state changes hold a
+    lock, and waiters are woken on their own loop.
+
+    :param requests_per_minute: Request cap; 0 disables the request bucket.
+    :param tokens_per_minute: Token cap; 0 disables the token bucket.
+    """
+
+    requests_per_minute: int = 3500
+    tokens_per_minute: int = 90000
+    clock: Callable[[], float] = time.monotonic
+
+    def __post_init__(self):
+        self.logger = logging.getLogger("tailoredscoops.openai_api.RateLimiter")
+        self.requests = float(self.requests_per_minute)
+        self.tokens = float(self.tokens_per_minute)
+        self.updated_at = self.clock()
+        self.waiters: Deque[asyncio.Future] = deque()
+        self.lock = threading.RLock()
+
+    def refill(self) -> None:
+        now = self.clock()
+        elapsed = now - self.updated_at
+        self.updated_at = now
+        self.requests = min(
+            self.requests_per_minute,
+            self.requests + elapsed * self.requests_per_minute / 60,
+        )
+        self.tokens = min(
+            self.tokens_per_minute, self.tokens + elapsed * self.tokens_per_minute / 60
+        )
+
+    def wait_time(self, tokens: int) -> float:
+        """Seconds until one request and `tokens` tokens are available (0 if now)."""
+        with self.lock:
+            self.refill()
+            wait = 0.0
+            if self.requests_per_minute and self.requests < 1:
+                wait = max(wait, (1 - self.requests) * 60 / self.requests_per_minute)
+            if self.tokens_per_minute and self.tokens < tokens:
+                wait = max(wait, (tokens - self.tokens) * 60 / self.tokens_per_minute)
+            return wait
+
+    def headroom(self) -> dict:
+        """Requests and tokens that could be reserved right now."""
+        with self.lock:
+            self.refill()
+            return {
+                "requests": int(self.requests),
+                "tokens": int(self.tokens),
+                "queued": len(self.waiters),
+            }
+
+    async def acquire(self, tokens: int) -> int:
+        """
+        Wait for, then reserve, one request and `tokens` tokens.
+
+        :param tokens: Estimated tokens; clamped to the bucket size.
+        :return: Tokens reserved, to be passed to `settle`.
+        """
+        if self.tokens_per_minute:
+            tokens = min(tokens, self.tokens_per_minute)
+        waiter = asyncio.get_running_loop().create_future()
+        with self.lock:
+            self.waiters.append(waiter)
+            first = self.waiters[0] is waiter
+        try:
+            if not first:
+                await waiter
+            while True:
+                with self.lock:
+                    wait = self.wait_time(tokens)
+                    if wait <= 0:
+                        self.requests -= 1
+                        self.tokens -= tokens
+                        return tokens
+                self.logger.info(
+                    f"rate limited | waiting {wait:.1f}s | {tokens} tokens"
+                )
+                await asyncio.sleep(wait)
+        finally:
+            with self.lock:
+                self.waiters.remove(waiter)
+                self.wake()
+
+    def wake(self) -> None:
+        # the head waiter may belong to another thread's loop; futures left
+        # behind by a closed loop are dropped
+        while self.waiters:
+            head = self.waiters[0]
+            loop = head.get_loop()
+            if head.done() or not loop.is_closed():
+                if not head.done():
+                    loop.call_soon_threadsafe(_release, head)
+                return
+            self.waiters.popleft()
+
+    def settle(self, reserved: int, used: int) -> None:
+        """
+        Replace a reservation with the tokens actually used.
+
+        :param reserved: Value returned by `acquire`.
+        :param used: Tokens reported by the API (`usage.total_tokens`).
+        """
+        with self.lock:
+            self.refill()
+            self.tokens = min(self.tokens_per_minute, self.tokens + reserved - used)
+
+
+def _release(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+shared_limiter = RateLimiter()
+
 
 @dataclass
 class ChatCompletion:
+    """
+    OpenAI chat completions with retries.
+
+    `acreate` is the native async client: at most `max_concurrency` requests are
+    in flight per event loop, and failed calls are retried after the server's
+    Retry-After or an exponential backoff with full jitter, without blocking
+    the loop. `create` is a synchronous wrapper (see `utils.run_sync`).
+
+    :param max_attempts: Total number of attempts per request.
+    :param backoff_base: Upper bound of the first backoff, in seconds.
+    :param backoff_max: Cap on any single backoff, in seconds.
+    :param max_concurrency: Maximum concurrent requests per event loop.
+    :param limiter: Rate limiter shared by every client of the account; None disables it.
+    """
+
     log: utils.Logger = utils.Logger()
+    max_attempts: int = 2
+    backoff_base: float = 4.0
+    backoff_max: float = 60.0
+    max_concurrency: int = 8
+    limiter: Optional[RateLimiter] = shared_limiter
 
     def __post_init__(self):
         self.log.setup_logger()
         self.logger = logging.getLogger("tailoredscoops.openai_api.ChatCompletion")
+        self._semaphore = None
+        self._semaphore_loop = None
 
-    def create(self, messages, model="gpt-3.5-turbo", temperature=0.3, max_tokens=4096):
+    def get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    @staticmethod
+    def retry_after(error: Exception) -> Optional[float]:
+        headers = getattr(error, "headers", None) or {}
+        try:
+            return float(headers.get("Retry-After") or headers.get("retry-after"))
+        except (TypeError, ValueError):
+            return None
 
-        num_retries = 0
-        while num_retries < 2:
+    def backoff(self, attempt: int, error: Optional[Exception] = None) -> float:
+        """Seconds to wait before retry number `attempt` (0-based)."""
+        retry_after = self.retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    async def acreate(
+        self, messages, model="gpt-3.5-turbo", temperature=0.3, max_tokens=4096
+    ):
+        prompt_tokens = 0
+        if self.limiter is not None:
+            prompt_tokens = num_tokens_from_messages(messages, model=model)
+
+        for attempt in range(self.max_attempts):
+            reserved = None
             try:
-                return openai.ChatCompletion.create(
-                    model=model,
-                    messages=messages,
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                )
+                async with self.get_semaphore():
+                    if self.limiter is not None:
+                        reserved = await self.limiter.acquire(
+                            prompt_tokens + max_tokens
+                        )
+                    response = await openai.ChatCompletion.acreate(
+                        model=model,
+                        messages=messages,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                    )
+                if reserved is not None:
+                    usage = response.get("usage") or {}
+                    self.limiter.settle(
+                        reserved, usage.get("total_tokens", prompt_tokens + max_tokens)
+                    )
+                return response
             except Exception as e:
-                num_retries += 1
+                if reserved is not None:
+                    self.limiter.settle(reserved, prompt_tokens)
                 self.logger.error(f"Error: {e}")
-                if num_retries < 2:
-                    self.logger.info("Retrying in 30 seconds...")
-                    time.sleep(30)
-        self.logger.error("API call failed after 2 retries. Exiting.")
+                if attempt + 1 < self.max_attempts:
+                    delay = self.backoff(attempt, e)
+                    self.logger.info(f"Retrying in {delay:.1f} seconds...")
+                    await asyncio.sleep(delay)
+        self.logger.error(f"API call failed after {self.max_attempts} attempts.")
+
+    def create(self, messages, model="gpt-3.5-turbo", temperature=0.3, max_tokens=4096):
+        return utils.run_sync(
+            self.acreate(
+                messages=messages,
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
+        )
@@ -1,6 +1,9 @@
+import asyncio
+import concurrent.futures
 import datetime
 import logging
 from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable
 
 import pandas as pd
 import pymongo
@@ -56,3 +59,58 @@ class RecipientList:
             df_sent = pd.DataFrame(sent)["email"]
             df_users = df_users.loc[~df_users["email"].isin(df_sent)]
         return df_users
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls that share a key into one execution.
+
+    The first caller starts the work as a task; later callers with the same key
+    await that task until it finishes. Waiters are counted: cancelling one of
+    them does not cancel the shared work while others still wait, but the work
+    is cancelled once the last waiter has left.
+    """
+
+    def __init__(self):
+        self.calls: Dict[Hashable, asyncio.Future] = {}
+        self.waiters: Dict[asyncio.Future, int] = {}
+
+    def __len__(self):
+        return len(self.calls)
+
+    async def do(self, key: Hashable, fn: Callable[..., Awaitable], *args, **kwargs):
+        task = self.calls.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self.calls[key] = task
+            task.add_done_callback(lambda _: self._forget(key, task))
+        self.waiters[task] = self.waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self.waiters[task] -= 1
+            if not self.waiters[task]:
+                del self.waiters[task]
+                if not task.done():
+                    # nobody is left to use the result
+                    task.cancel()
+
+    def _forget(self, key: Hashable, task: asyncio.Future) -> None:
+        if self.calls.get(key) is task:
+            del self.calls[key]
+
+
+def run_sync(coro: Awaitable) -> Any:
+    """
+    Run a coroutine to completion from synchronous code.
+
+    Inside a running event loop (a notebook, or a coroutine calling a
+    synchronous API) the coroutine runs on a private loop in a worker thread,
+    and the caller blocks until it is done, as any synchronous call would.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
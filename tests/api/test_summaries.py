@@ -108,7 +108,7 @@ def test_format_summary(summaries_fixture, saved_summary_fixture):
 @pytest.mark.asyncio
 async def test_create_summary(summaries_fixture, return_value, expected):
     with patch(
-        "tailoredscoop.documents.summarize.OpenaiSummarizer.get_openai_summary"
+        "tailoredscoop.documents.summarize.OpenaiSummarizer.aget_openai_summary"
     ) as mocked_get_openai_summary:
         mocked_get_openai_summary.return_value = "This is a mocked summary."
         email = "test@example.com"
@@ -150,3 +150,52 @@ async def test_get_summary(summaries_fixture):
     )
     assert summary.startswith("HELLO!")
     assert check_id == summary_id
+
+
+@pytest.mark.asyncio
+async def test_get_summary_single_flight(db, summaries_fixture, saved_summary_fixture):
+    calls = []
+
+    async def create_summary(email, news_downloader, summary_id, kw=None):
+        calls.append(email)
+        await asyncio.sleep(0.01)
+        return saved_summary_fixture
+
+    summaries_fixture.news_downloader = MagicMock()
+    summaries_fixture.create_summary = create_summary
+
+    results = await asyncio.gather(
+        *[
+            summaries_fixture.get_summary(email=f"user{i}@email.com", kw="keyword")
+            for i in range(5)
+        ]
+    )
+
+    assert len(calls) == 1
+    assert all(summary.startswith("Sample summary") for summary, _ in results)
+
+
+@pytest.mark.asyncio
+async def test_build_summary_waits_for_other_lease_holder(
+    db, summaries_fixture, saved_summary_fixture
+):
+    other_process = replace(summaries_fixture)
+    summary_id = summaries_fixture.summary_hash("keyword")
+    assert other_process.summary_lease.acquire(summary_id)
+
+    summaries_fixture.summary_lease_poll = 0.01
+    summaries_fixture.create_summary = MagicMock()
+    task = asyncio.ensure_future(
+        summaries_fixture.build_summary(
+            email="user1@email.com", summary_id=summary_id, kw="keyword"
+        )
+    )
+    await asyncio.sleep(0.02)
+    assert not task.done()
+
+    db.summaries.insert_one({"summary_id": summary_id, **saved_summary_fixture})
+    other_process.summary_lease.release(summary_id)
+
+    summary = await task
+    assert summary["summary"] == "Sample summary"
+    summaries_fixture.create_summary.assert_not_called()
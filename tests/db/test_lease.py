@@ -0,0 +1,47 @@
+import asyncio
+import datetime
+
+import mongomock
+import pytest
+
+from tailoredscoop.db.lease import MongoLease
+
+
+def test_lease_is_exclusive_until_released():
+    db = mongomock.MongoClient().db
+    first = MongoLease(collection=db.leases)
+    second = MongoLease(collection=db.leases)
+
+    assert first.acquire("summary")
+    assert first.acquire("summary")
+    assert not second.acquire("summary")
+    assert second.acquire("other")
+
+    first.release("summary")
+    assert second.acquire("summary")
+
+
+def test_expired_lease_can_be_taken_over():
+    db = mongomock.MongoClient().db
+    first = MongoLease(collection=db.leases, ttl=datetime.timedelta(seconds=-1))
+    second = MongoLease(collection=db.leases)
+
+    assert first.acquire("summary")
+    assert second.acquire("summary")
+    assert not first.acquire("summary")
+
+
+@pytest.mark.asyncio
+async def test_keep_alive_extends_lease():
+    db = mongomock.MongoClient().db
+    first = MongoLease(collection=db.leases, ttl=datetime.timedelta(seconds=0.06))
+    second = MongoLease(collection=db.leases)
+
+    assert first.acquire("summary")
+    renewal = asyncio.ensure_future(first.keep_alive("summary"))
+    await asyncio.sleep(0.15)
+    assert not second.acquire("summary")
+
+    renewal.cancel()
+    await asyncio.sleep(0.1)
+    assert second.acquire("summary")
@@ -0,0 +1,30 @@
+import datetime
+
+import mongomock
+
+from tailoredscoop.db.memo import MemoStore
+
+
+def test_normalize():
+    assert MemoStore.normalize('  Supreme   Court ') == "supreme court"
+    assert MemoStore.normalize('"SCOTUS", justice ,') == "scotus,justice"
+
+
+def test_memo_hits_misses_and_ttl():
+    db = mongomock.MongoClient().db
+    memo = MemoStore(ttl=datetime.timedelta(days=1))
+
+    assert memo.get(db=db, kind="topic", kw="supreme court") is None
+    memo.set(db=db, kind="topic", kw="supreme court", value="politics")
+    assert memo.get(db=db, kind="topic", kw="Supreme  Court") == "politics"
+    assert memo.get(db=db, kind="similar_keywords", kw="supreme court") is None
+    assert memo.stats() == {
+        "topic": {"hits": 1, "misses": 1},
+        "similar_keywords": {"hits": 0, "misses": 1},
+    }
+
+    db.llm_memo.update_many(
+        {},
+        {"$set": {"created_at": datetime.datetime.now() - datetime.timedelta(days=2)}},
+    )
+    assert memo.get(db=db, kind="topic", kw="supreme court") is None
@@ -0,0 +1,90 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import mongomock
+import pytest
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import AutoReconnect
+
+from tailoredscoop.db.writer import BulkWriter, BulkWriters
+
+
+@pytest.fixture
+def db():
+    return mongomock.MongoClient().db
+
+
+def test_flush_on_max_ops(db):
+    writer = BulkWriter(collection=db.articles, max_ops=3, max_delay=60)
+    for i in range(2):
+        writer.add(ReplaceOne({"url": i}, {"url": i}, upsert=True), key=i)
+    assert db.articles.count_documents({}) == 0
+
+    writer.add(ReplaceOne({"url": 2}, {"url": 2}, upsert=True), key=2)
+    assert db.articles.count_documents({}) == 3
+    assert writer.pending == []
+    assert writer.n_written == 3
+
+
+def test_flush_on_max_delay(db):
+    writer = BulkWriter(collection=db.articles, max_ops=100, max_delay=0)
+    writer.add(ReplaceOne({"url": 1}, {"url": 1}, upsert=True), key=1)
+    assert db.articles.count_documents({}) == 1
+
+
+def test_errors_reported_per_document(db):
+    db.articles.create_index("url", unique=True)
+    db.articles.insert_many([{"url": "a", "n": 0}, {"url": "b", "n": 0}])
+    writer = BulkWriter(collection=db.articles, max_ops=100, max_delay=60)
+
+    writer.add(UpdateOne({"url": "a"}, {"$set": {"n": 1}}), key="a")
+    writer.add(UpdateOne({"url": "b"}, {"$set": {"url": "a"}}), key="b")
+    errors = writer.flush()
+
+    assert [error["key"] for error in errors] == ["b"]
+    assert db.articles.find_one({"url": "a"})["n"] == 1
+    assert writer.n_written == 1
+
+
+@pytest.mark.asyncio
+async def test_drain_in_event_loop(db):
+    writers = BulkWriters(max_ops=2, max_delay=60)
+    writer = writers.get(db.articles)
+    assert writers.get(db.articles) is writer
+
+    for i in range(3):
+        writer.add(ReplaceOne({"url": i}, {"url": i}, upsert=True), key=i)
+    await writers.drain()
+
+    assert db.articles.count_documents({}) == 3
+    assert not writer.in_flight
+
+
+@pytest.mark.asyncio
+async def test_flush_on_timer(db):
+    writer = BulkWriter(collection=db.articles, max_ops=100, max_delay=0.01)
+    writer.add(ReplaceOne({"url": 1}, {"url": 1}, upsert=True), key=1)
+    assert db.articles.count_documents({}) == 0
+
+    await asyncio.sleep(0.05)
+
+    assert db.articles.count_documents({}) == 1
+    assert not writer.in_flight
+
+
+def test_failed_batch_is_requeued(db):
+    collection = MagicMock(wraps=db.articles)
+    collection.name = "articles"
+    collection.bulk_write.side_effect = [AutoReconnect("connection lost"), None]
+    writer = BulkWriter(collection=collection, max_ops=100, max_delay=60)
+    writer.add(ReplaceOne({"url": 1}, {"url": 1}, upsert=True), key=1)
+
+    assert writer.flush() == []
+    assert len(writer.pending) == 1
+
+    writer.add(ReplaceOne({"url": 2}, {"url": 2}, upsert=True), key=2)
+    writer.flush()
+
+    assert writer.pending == []
+    assert writer.n_written == 2
+    assert len(collection.bulk_write.call_args[0][0]) == 2
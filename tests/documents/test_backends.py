@@ -0,0 +1,29 @@
+import sys
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from tailoredscoop.documents.backends import load_summarizer
+from tailoredscoop.documents.process import DocumentProcessor
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        load_summarizer("fp16")
+
+
+def test_onnx_backend_needs_optimum(monkeypatch):
+    monkeypatch.setenv("SUMMARIZER_BACKEND", "onnx")
+    with patch.dict(sys.modules, {"optimum": None, "optimum.onnxruntime": None}):
+        with pytest.raises(ImportError, match="optimum"):
+            load_summarizer()
+
+
+def test_backend_is_part_of_summarizer_name():
+    model = SimpleNamespace(name_or_path="facebook/bart-large-cnn")
+    fp32 = SimpleNamespace(model=model)
+    int8 = SimpleNamespace(model=model, backend="int8")
+
+    assert DocumentProcessor.summarizer_name(fp32) == "facebook/bart-large-cnn"
+    assert DocumentProcessor.summarizer_name(int8) == "facebook/bart-large-cnn:int8"
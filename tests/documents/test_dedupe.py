@@ -0,0 +1,64 @@
+import random
+
+import numpy as np
+
+from tailoredscoop.documents.dedupe import (
+    MinHasher,
+    NearDuplicateIndex,
+    remove_near_duplicates,
+    shingles,
+)
+
+random.seed(0)
+VOCAB = [f"word{i}" for i in range(2000)]
+
+
+def story(n_words=300):
+    return [random.choice(VOCAB) for _ in range(n_words)]
+
+
+def test_signature_is_stable_and_estimates_similarity():
+    hasher = MinHasher(num_perm=128)
+    words = story()
+    edited = words[:290] + ["breaking"] * 10
+
+    a = hasher.signature(" ".join(words))
+    assert np.array_equal(a, MinHasher(num_perm=128).signature(" ".join(words)))
+    assert hasher.similarity(a, hasher.signature(" ".join(edited))) > 0.8
+    assert hasher.similarity(a, hasher.signature(" ".join(story()))) < 0.1
+
+
+def test_index_finds_syndicated_copies():
+    index = NearDuplicateIndex()
+    wire = story()
+    index.add("ap", " ".join(wire))
+    index.add("other", " ".join(story()))
+
+    syndicated = "Reuters - " + " ".join(wire) + " Copyright 2023."
+    assert index.query(syndicated) == ["ap"]
+    assert index.query(" ".join(story())) == []
+
+
+def test_remove_near_duplicates_keeps_best_ranked():
+    wire = " ".join(story())
+    articles = [
+        {"url": "a", "content": " ".join(story())},
+        {"url": "b", "content": wire},
+        {"url": "c"},
+        {"url": "d", "content": "(AP) " + wire},
+        {"url": "e", "content": None},
+    ]
+
+    kept = remove_near_duplicates(articles)
+
+    assert [article["url"] for article in kept] == ["a", "b", "c", "e"]
+
+
+def test_remove_near_duplicates_keeps_articles_without_words():
+    assert len(shingles("*** --- ***")) == 0
+    articles = [
+        {"url": "a", "content": "*** --- ***"},
+        {"url": "b", "content": "!!! ..."},
+    ]
+
+    assert remove_near_duplicates(articles) == articles
@@ -0,0 +1,65 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from tailoredscoop.documents.executor import SummarizationExecutor
+
+
+@pytest.fixture
+def executor():
+    executor = SummarizationExecutor(max_queue=2)
+    yield executor
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_run_keeps_event_loop_free(executor):
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.005)
+
+    def infer(text):
+        time.sleep(0.1)
+        return (text.upper(), threading.current_thread().name)
+
+    task = asyncio.create_task(ticker())
+    result = await executor.run(infer, "summary")
+    task.cancel()
+
+    assert result == ("SUMMARY", "summarization")
+    assert ticks >= 5
+
+
+@pytest.mark.asyncio
+async def test_queue_depth_is_bounded_and_measured(executor):
+    depths = []
+
+    def infer(i):
+        # requests still waiting while this one runs
+        depths.append(executor.requests.qsize())
+        time.sleep(0.01)
+        return i
+
+    results = await asyncio.gather(*[executor.run(infer, i) for i in range(6)])
+
+    assert results == list(range(6))
+    assert max(depths) <= executor.max_queue - 1
+    stats = executor.stats()
+    assert stats["completed"] == 6
+    assert stats["latency_p95"] >= 0.01
+
+
+@pytest.mark.asyncio
+async def test_run_raises_the_worker_exception(executor):
+    def infer():
+        raise RuntimeError("out of memory")
+
+    with pytest.raises(RuntimeError, match="out of memory"):
+        await executor.run(infer)
+    assert executor.stats()["failed"] == 1
@@ -0,0 +1,74 @@
+from dataclasses import dataclass, field
+from unittest.mock import AsyncMock, MagicMock
+
+import mongomock
+import pytest
+
+from tailoredscoop.db.memo import MemoStore
+from tailoredscoop.documents.keywords import Keywords
+
+
+@dataclass
+class KeywordsWithMemo(Keywords):
+    openai_api: MagicMock = field(default_factory=MagicMock)
+    keyword_memo: MemoStore = field(default_factory=MemoStore)
+
+
+def response(content):
+    return {"choices": [{"message": {"content": content}}]}
+
+
+@pytest.fixture
+def keywords():
+    keywords = KeywordsWithMemo()
+    keywords.openai_api.acreate = AsyncMock(
+        side_effect=[response("'SCOTUS, justice'"), response("politics")]
+    )
+    return keywords
+
+
+def test_memoized_llm_calls(keywords):
+    db = mongomock.MongoClient().db
+
+    for _ in range(3):
+        assert keywords.get_similar_keywords_from_gpt("supreme court", db=db) == (
+            "SCOTUS, justice"
+        )
+        assert keywords.get_topic("Supreme Court", db=db) == "politics"
+
+    assert keywords.openai_api.acreate.await_count == 2
+    assert keywords.keyword_memo.hits["topic"] == 2
+
+
+def test_no_memo_without_db(keywords):
+    keywords.get_similar_keywords_from_gpt("supreme court")
+    assert keywords.keyword_memo.stats() == {}
+
+
+@pytest.mark.asyncio
+async def test_async_memoized_llm_calls():
+    db = mongomock.MongoClient().db
+    keywords = KeywordsWithMemo()
+    keywords.openai_api.acreate = AsyncMock(return_value=response("politics"))
+
+    assert await keywords.aget_topic("Supreme Court", db=db) == "politics"
+    assert await keywords.aget_topic("supreme court", db=db) == "politics"
+    # the sync API still works inside a running loop
+    assert keywords.get_similar_keywords_from_gpt("supreme court") == "politics"
+    assert keywords.openai_api.acreate.await_count == 2
+    keywords.openai_api.create.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_empty_answers_are_not_memoized():
+    db = mongomock.MongoClient().db
+    keywords = KeywordsWithMemo()
+    keywords.openai_api.acreate = AsyncMock(
+        side_effect=[response("Sorry, I can't."), response("'SCOTUS, justice'")]
+    )
+
+    assert await keywords.aget_similar_keywords_from_gpt("supreme court", db=db) == ""
+    assert await keywords.aget_similar_keywords_from_gpt("supreme court", db=db) == (
+        "SCOTUS, justice"
+    )
+    assert db.llm_memo.count_documents({}) == 1
@@ -0,0 +1,180 @@
+import re
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import mongomock
+import pytest
+from tokenizers import Tokenizer, models, pre_tokenizers, processors
+
+from tailoredscoop.db.summary_cache import SummaryCache
+from tailoredscoop.db.writer import BulkWriters
+from tailoredscoop.documents.process import DocumentProcessor
+
+
+class WordTokenizer:
+    def encode(self, text):
+        matches = list(re.finditer(r"\w+|[^\w\s]", text))
+        return SimpleNamespace(
+            tokens=[m.group() for m in matches], offsets=[m.span() for m in matches]
+        )
+
+    def encode_batch(self, texts):
+        return [self.encode(text) for text in texts]
+
+
+class FakeSummarizer:
+    """Summarizes to the first `max_length` words; "short" articles to 1 word."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts, min_length, max_length, **kwargs):
+        self.calls.append((len(texts), min_length, max_length))
+        return [
+            {
+                "summary_text": "x"
+                if text.startswith("short")
+                else " ".join(text.split()[:max_length])
+            }
+            for text in texts
+        ]
+
+
+@dataclass
+class Processor(DocumentProcessor):
+    tokenizer: WordTokenizer = field(default_factory=WordTokenizer)
+    openai_summarizer: MagicMock = field(default_factory=MagicMock)
+    writers: BulkWriters = field(default_factory=BulkWriters)
+    summary_cache: SummaryCache = field(default_factory=SummaryCache)
+
+    def __post_init__(self):
+        super().__post_init__()
+        self.openai_summarizer.num_tokens_from_texts.side_effect = lambda texts: [
+            len(text.split()) for text in texts
+        ]
+
+
+def article(i, n_words, prefix="word"):
+    return {
+        "_id": i,
+        "url": f"https://example.com/{i}",
+        "title": f"title {i}",
+        "content": " ".join([prefix] * n_words + [str(i)]),
+    }
+
+
+@pytest.fixture
+def db():
+    db = mongomock.MongoClient().db
+    db.articles.insert_many([{"_id": i} for i in range(10)])
+    return db
+
+
+def test_process_batches_by_length(db):
+    processor = Processor()
+    summarizer = FakeSummarizer()
+    articles = [article(i, 1000) for i in range(3)] + [article(3, 300)]
+
+    res, titles = processor.process(articles, summarizer, db=db, max_articles=4)
+
+    assert titles == ["title 0", "title 1", "title 2", "title 3"]
+    # the three long articles share min/max lengths and run as one batch
+    assert sorted(summarizer.calls) == [(1, 100, 150), (3, 200, 250)]
+    assert db.articles.count_documents({"summary": {"$exists": True}}) == 4
+
+
+def test_process_keeps_skip_rule_and_max_articles(db):
+    processor = Processor()
+    summarizer = FakeSummarizer()
+    articles = [
+        article(0, 1000),
+        article(1, 1000, prefix="short"),
+        article(2, 1000),
+        article(3, 1000),
+        article(4, 1000),
+    ]
+
+    res, titles = processor.process(articles, summarizer, db=db, max_articles=3)
+
+    assert titles == ["title 0", "title 2", "title 3"]
+    # a window of 3, then a window of 1 to replace the skipped article
+    assert [n for n, _, _ in summarizer.calls] == [3, 1]
+    assert list(res) == [f"https://example.com/{i}" for i in (0, 2, 3)]
+
+
+def test_process_reuses_cached_summaries(db):
+    articles = [article(i, 1000) for i in range(3)]
+    first = FakeSummarizer()
+    Processor().process(articles[:2], first, db=db, max_articles=2)
+
+    processor = Processor()
+    second = FakeSummarizer()
+    res, titles = processor.process(articles, second, db=db, max_articles=3)
+
+    assert titles == ["title 0", "title 1", "title 2"]
+    # only the article not summarized in the first run reaches the model
+    assert second.calls == [(1, 200, 250)]
+    assert processor.summary_cache.hits["summary"] == 2
+    assert db.article_summaries.count_documents({}) == 3
+
+
+def test_process_screens_articles_before_inference(db):
+    processor = Processor()
+    summarizer = FakeSummarizer()
+    teaser = article(1, 300)
+    teaser["content"] += " Already a subscriber? Sign in to continue reading."
+    articles = [article(0, 1000), teaser, article(2, 100), article(3, 1000)]
+
+    res, titles = processor.process(articles, summarizer, db=db, max_articles=2)
+
+    assert titles == ["title 0", "title 3"]
+    # the window looked past the teaser and the stub instead of summarizing them
+    assert summarizer.calls == [(2, 200, 250)]
+
+
+def test_split_text_into_chunks_cuts_on_tokens_and_sentences():
+    processor = Processor()
+    text = " ".join(f"Sentence {i} has five words." for i in range(20))
+
+    chunks = list(processor.split_text_into_chunks(text, max_tokens=14))
+
+    assert all(len(processor.tokenizer.encode(c).tokens) <= 14 for c in chunks)
+    assert all(chunk.endswith(".") for chunk in chunks)
+    assert " ".join(chunks) == text
+
+
+def test_split_text_into_chunks_skips_special_tokens():
+    tokenizer = Tokenizer(
+        models.WordLevel(vocab={"[UNK]": 0, "[CLS]": 1, "[SEP]": 2}, unk_token="[UNK]")
+    )
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer.post_processor = processors.TemplateProcessing(
+        single="[CLS] $A [SEP]", special_tokens=[("[CLS]", 1), ("[SEP]", 2)]
+    )
+    processor = Processor()
+    processor.tokenizer = tokenizer
+    text = " ".join(f"Sentence {i} has five words." for i in range(20))
+
+    chunks = list(processor.split_text_into_chunks(text, max_tokens=14))
+
+    assert all(chunks)
+    assert " ".join(chunks) == text
+
+
+def test_long_form_map_reduce(db):
+    processor = Processor()
+    processor.long_form_tokens = 50
+    processor.chunk_tokens = 20
+    summarizer = FakeSummarizer()
+    articles = [article(0, 1000), article(1, 30)]
+
+    summaries = processor.summarize_batch([a["content"] for a in articles], summarizer)
+
+    # map: 1001 tokens in 20-token chunks, 8 per pipeline call
+    map_calls = summarizer.calls[:-2]
+    assert sum(n for n, _, _ in map_calls) == 51
+    assert max(n for n, _, _ in map_calls) == processor.summary_batch_size
+    # reduce: the joined chunk summaries run with the short article
+    assert len(summaries) == 2
+    assert summaries[1] == articles[1]["content"][: len(summaries[1])]
@@ -0,0 +1,128 @@
+import datetime
+
+import mongomock
+import pytest
+
+from tailoredscoop.db.writer import BulkWriter
+from tailoredscoop.news.boilerplate import BoilerplateFilter, fingerprint
+
+SIGNUP = "Sign up for our morning newsletter to get the top stories."
+COPYRIGHT = "Copyright 2023 Example News. All rights reserved."
+
+
+TOPICS = ["budget", "election", "storm", "trial", "merger"]
+
+
+def page(i):
+    return "\n".join(
+        [
+            f"The {TOPICS[i]} story starts here with its own reporting.",
+            SIGNUP,
+            f"The {TOPICS[i]} story ends.",
+            COPYRIGHT,
+        ]
+    )
+
+
+@pytest.fixture
+def db():
+    return mongomock.MongoClient().db
+
+
+def test_fingerprint_normalizes_case_digits_and_whitespace():
+    assert fingerprint("Copyright 2023  Example") == fingerprint(
+        "copyright 2024 example"
+    )
+    assert fingerprint("Copyright Example") != fingerprint("Copyright 2023 Example")
+
+
+def test_repeated_paragraphs_are_dropped_after_min_pages(db):
+    boilerplate = BoilerplateFilter(min_pages=3)
+
+    assert boilerplate.clean(db, "example.com", "u1", page(1)) == page(1)
+    assert boilerplate.clean(db, "example.com", "u2", page(2)) == page(2)
+    cleaned = boilerplate.clean(
+        db, "example.com", "u3", page(3), count_tokens=lambda text: len(text.split())
+    )
+
+    assert cleaned == (
+        "The trial story starts here with its own reporting.\nThe trial story ends."
+    )
+    stats = boilerplate.stats()["example.com"]
+    assert stats["paragraphs"] == 2
+    assert stats["bytes"] == len(page(3)) - len(cleaned)
+    assert stats["tokens"] == len(SIGNUP.split()) + len(COPYRIGHT.split())
+    # other domains are unaffected
+    assert boilerplate.clean(db, "other.com", "u4", page(4)) == page(4)
+
+
+def test_counts_are_persisted_once_per_page(db):
+    writer = BulkWriter(collection=db.boilerplate)
+    first = BoilerplateFilter(min_pages=2)
+    first.clean(db, "example.com", "u1", page(1), writer=writer)
+    first.clean(db, "example.com", "u1", page(1), writer=writer)
+    writer.flush()
+
+    stored = db.boilerplate.find_one(
+        {"domain": "example.com", "fingerprint": fingerprint(SIGNUP)}
+    )
+    assert stored["pages"] == 1
+
+    # a new process picks up the learned counts
+    second = BoilerplateFilter(min_pages=2)
+    assert SIGNUP not in second.clean(db, "example.com", "u2", page(2))
+
+
+def test_all_boilerplate_page_is_kept(db):
+    boilerplate = BoilerplateFilter(min_pages=1)
+    assert boilerplate.clean(db, "example.com", "u1", SIGNUP) == SIGNUP
+
+
+def test_counted_pages_are_persisted(db):
+    BoilerplateFilter(min_pages=2).clean(db, "example.com", "u1", page(1))
+
+    # a new process does not count the same page again
+    BoilerplateFilter(min_pages=2).clean(db, "example.com", "u1", page(1))
+
+    stored = db.boilerplate.find_one(
+        {"domain": "example.com", "fingerprint": fingerprint(SIGNUP)}
+    )
+    assert stored["pages"] == 1
+    assert db.boilerplate_pages.count_documents({"domain": "example.com"}) == 1
+
+
+def test_stale_fingerprints_are_ignored(db):
+    boilerplate = BoilerplateFilter(min_pages=2)
+    boilerplate.clean(db, "example.com", "u1", page(1))
+    db.boilerplate.update_many(
+        {}, {"$set": {"seen_at": datetime.datetime.now() - datetime.timedelta(days=31)}}
+    )
+
+    cleaned = BoilerplateFilter(min_pages=2).clean(db, "example.com", "u2", page(2))
+
+    assert cleaned == page(2)
+
+
+def test_page_markers_go_through_the_writer(db):
+    writer = BulkWriter(collection=db.boilerplate_pages, max_ops=100, max_delay=60)
+    boilerplate = BoilerplateFilter(min_pages=2)
+    boilerplate.clean(db, "example.com", "u1", page(1), page_writer=writer)
+    boilerplate.clean(db, "example.com", "u1", page(1), page_writer=writer)
+    assert db.boilerplate_pages.count_documents({}) == 0
+
+    writer.flush()
+    assert db.boilerplate_pages.count_documents({"url": "u1"}) == 1
+
+
+def test_prune_uses_instance_ttl(db):
+    BoilerplateFilter().clean(db, "example.com", "u1", page(1))
+    db.boilerplate.update_many(
+        {}, {"$set": {"seen_at": datetime.datetime.now() - datetime.timedelta(days=2)}}
+    )
+
+    BoilerplateFilter(ttl=datetime.timedelta(days=7)).domain_counts(db, "example.com")
+    assert db.boilerplate.count_documents({}) > 0
+
+    BoilerplateFilter(ttl=datetime.timedelta(days=1)).domain_counts(db, "example.com")
+    assert db.boilerplate.count_documents({}) == 0
+    assert db.boilerplate_pages.count_documents({}) == 1
@@ -0,0 +1,77 @@
+import datetime
+
+import mongomock
+import pytest
+
+from tailoredscoop.news.breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    FailureCache,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def test_circuit_opens_after_threshold(clock):
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=60, clock=clock)
+    for _ in range(2):
+        breaker.record_failure("example.com")
+    assert breaker.allow("example.com")
+
+    breaker.record_failure("example.com")
+    assert breaker.state("example.com") == OPEN
+    assert not breaker.allow("example.com")
+    assert breaker.allow("other.com")
+
+
+def test_circuit_half_open_probe(clock):
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=60, clock=clock)
+    breaker.record_failure("example.com")
+
+    clock.now = 61
+    assert breaker.allow("example.com")
+    assert breaker.state("example.com") == HALF_OPEN
+    assert not breaker.allow("example.com")
+
+    breaker.record_failure("example.com")
+    assert breaker.state("example.com") == OPEN
+    assert not breaker.allow("example.com")
+
+    clock.now = 122
+    assert breaker.allow("example.com")
+    breaker.record_success("example.com")
+    assert breaker.state("example.com") == CLOSED
+    assert breaker.allow("example.com")
+
+
+def test_failure_cache_ttl():
+    db = mongomock.MongoClient().db
+    cache = FailureCache(ttl=datetime.timedelta(hours=1))
+    cache.record(db=db, url="https://example.com/a", link="news.google/rss/1")
+
+    assert cache.is_failed(db=db, link="news.google/rss/1")
+    assert cache.is_failed(db=db, link="https://example.com/a")
+    assert not cache.is_failed(db=db, link="news.google/rss/2")
+    assert cache.failed_links(
+        db=db, links=["news.google/rss/1", "https://example.com/a", "news.google/rss/2"]
+    ) == {"news.google/rss/1", "https://example.com/a"}
+
+    db.article_download_fails.update_one(
+        {"url": "https://example.com/a"},
+        {"$set": {"failed_at": datetime.datetime.now() - datetime.timedelta(hours=2)}},
+    )
+    assert not cache.is_failed(db=db, link="news.google/rss/1")
+    assert cache.failed_links(db=db, links=["news.google/rss/1"]) == set()
@@ -0,0 +1,113 @@
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import mongomock
+import pytest
+
+from tailoredscoop.news.extract import (
+    ENGINES,
+    ArticleExtractor,
+    ExtractionRules,
+    extract_bs4,
+    extract_with_rule,
+)
+
+FAKE_NEWS = Path(__file__).resolve().parents[2] / "tailoredscoop/news/fake_news"
+
+PAGES = [
+    "<html><body><article><p>One</p><div><p>Two <b>bold</b></p></div></article>"
+    "<p>outside</p></body></html>",
+    "<html><body><div class='main-article body'><p>Classed</p></div>"
+    "<div class='sidebar'><p>no</p></div></body></html>",
+    "<html><body><div><p>No container</p></div></body></html>",
+    "",
+]
+
+
+@pytest.mark.parametrize("engine", list(ENGINES))
+@pytest.mark.parametrize("html", PAGES)
+def test_engines_match_reference(engine, html):
+    assert ENGINES[engine](html) == extract_bs4(html)
+
+
+@pytest.mark.parametrize("engine", list(ENGINES))
+def test_engines_on_saved_pages(engine):
+    for page in sorted(FAKE_NEWS.glob("*.html")):
+        html = page.read_text()
+        assert ENGINES[engine](html) == extract_bs4(html)
+
+
+@pytest.mark.asyncio
+async def test_article_extractor_thread_pool():
+    extractor = ArticleExtractor(engine="lxml", max_workers=2)
+    try:
+        assert await extractor.extract(PAGES[0]) == "One\nTwo bold"
+        assert await extractor.extract(PAGES[2]) is None
+    finally:
+        extractor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_article_extractor_process_pool():
+    extractor = ArticleExtractor(engine="lxml", max_workers=1, processes=True)
+    try:
+        assert await extractor.extract(PAGES[0]) == "One\nTwo bold"
+        assert await extractor.extract(PAGES[2]) is None
+    finally:
+        extractor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_article_extractor_replaces_broken_pool():
+    extractor = ArticleExtractor(engine="lxml", max_workers=1, processes=True)
+    broken = MagicMock()
+    broken.submit.side_effect = BrokenProcessPool("worker died")
+    extractor.executor = broken
+    try:
+        with pytest.raises(BrokenProcessPool):
+            await extractor.extract(PAGES[0])
+        broken.shutdown.assert_called_once_with(wait=False)
+
+        assert await extractor.extract(PAGES[0]) == "One\nTwo bold"
+    finally:
+        extractor.shutdown()
+
+
+def test_article_extractor_unknown_engine():
+    with pytest.raises(ValueError):
+        ArticleExtractor(engine="regex")
+
+
+RULE_PAGE = (
+    "<html><body><div class='article-wrapper'><p>nav</p>"
+    "<div class='article-body'><p>{}</p></div>"
+    "<div class='article-comments'><p>first!</p></div></div></body></html>"
+)
+
+
+def test_learn_and_reuse_rule():
+    html = RULE_PAGE.format("x" * 600)
+    content, rule = extract_with_rule(html, rule=None)
+    assert content == extract_bs4(html)
+    assert rule == "class:article-body"
+
+    content, same_rule = extract_with_rule(html, rule=rule)
+    assert content == "x" * 600
+    assert same_rule == rule
+
+
+def test_relearn_rule_when_text_too_short():
+    html = "<html><body><article><p>{}</p></article></body></html>".format("y" * 600)
+    content, rule = extract_with_rule(html, rule="class:article-body")
+    assert content == "y" * 600
+    assert rule == "article"
+
+
+def test_extraction_rules_persisted():
+    db = mongomock.MongoClient().db
+    rules = ExtractionRules()
+    assert rules.get(db=db, domain="example.com") is None
+
+    rules.set(db=db, domain="example.com", rule="article")
+    assert ExtractionRules().get(db=db, domain="example.com") == "article"
@@ -0,0 +1,43 @@
+import mongomock
+import pytest
+
+from tailoredscoop.news.feeds import FeedCache
+
+
+@pytest.fixture
+def db():
+    return mongomock.MongoClient().db
+
+
+def test_conditional_headers(db):
+    cache = FeedCache()
+    url = "https://news.google.com/rss/topics/test"
+    assert cache.conditional_headers(cache.get(db=db, url=url)) == {}
+
+    cache.store(
+        db=db,
+        url=url,
+        body="<rss></rss>",
+        headers={"ETag": '"v1"', "Last-Modified": "Fri, 19 May 2023 21:40:11 GMT"},
+    )
+    cached = cache.get(db=db, url=url)
+
+    assert cached["body"] == "<rss></rss>"
+    assert cache.conditional_headers(cached) == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Fri, 19 May 2023 21:40:11 GMT",
+    }
+
+
+def test_parsed_memo_requires_matching_validators(db):
+    cache = FeedCache()
+    url = "https://news.google.com/rss/topics/test"
+    cached = cache.store(db=db, url=url, body="<rss></rss>", headers={"ETag": "a"})
+    cache.set_parsed(url=url, cached=cached, entries=[{"title": "x"}])
+
+    assert cache.get_parsed(url=url, cached=cached) == [{"title": "x"}]
+    assert cache.get_parsed(url=url, cached={"etag": "b"}) is None
+
+    cached = cache.store(db=db, url=url, body="<rss></rss>", headers={})
+    cache.set_parsed(url=url, cached=cached, entries=[])
+    assert cache.get_parsed(url=url, cached=cached) is None
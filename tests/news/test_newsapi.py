@@ -1,17 +1,35 @@
+import asyncio
 import datetime
+from concurrent.futures.process import BrokenProcessPool
 
 import mongomock
 import pytest
+import pytest_asyncio
 from aiohttp.test_utils import make_mocked_coro
 from aioresponses import aioresponses
 
 from tailoredscoop.news.newsapi_with_google_kw import NewsAPI
+from tailoredscoop.news.redirects import RedirectCache
+from tailoredscoop.news.stream import DownloadAborted
+
+
+class MockContent:
+    def __init__(self, body):
+        self._body = body
+
+    async def iter_chunked(self, n):
+        for i in range(0, len(self._body), n):
+            yield self._body[i : i + n]
 
 
 class MockResponse:
-    def __init__(self, text, status):
+    def __init__(self, text, status, content_type="text/html; charset=utf-8"):
         self._text = text
         self.status = status
+        self.headers = {"Content-Type": content_type}
+        self.charset = "utf-8"
+        self.content_length = len(text)
+        self.content = MockContent(text)
 
     async def text(self):
         return self._text
@@ -86,6 +104,13 @@ def news_api() -> NewsAPI:
     return NewsAPI(api_key="")
 
 
+@pytest_asyncio.fixture(autouse=True)
+async def close_news_api(news_api):
+    # tests share one NewsAPI, but each event loop needs its own session
+    yield
+    await news_api.close()
+
+
 @pytest.fixture
 def db() -> mongomock.database.Database:
     client = mongomock.MongoClient()
@@ -185,3 +210,316 @@ async def test_process_article(mocker, content, mock_articles, news_api, db):
 
     stored_article = db.articles.find_one({"link": mock_articles[0]["link"]})
     assert stored_article["rank"] == 100
+
+
+@pytest.mark.asyncio
+async def test_shared_session(mocker, news_api):
+    session = news_api.get_session()
+    assert news_api.get_session() is session
+    assert session.connector.limit_per_host == news_api.connection_limit_per_host
+    executor = news_api.extractor.get_executor()
+    logger = mocker.patch.object(news_api, "logger")
+    news_api.keyword_memo.hits["topic"] += 1
+
+    await news_api.close()
+    logger.info.assert_any_call(f"keyword memo | {news_api.keyword_memo.stats()}")
+    assert session.closed
+    # the extraction pool outlives the event loop
+    assert news_api.extractor.get_executor() is executor
+    assert news_api.get_session() is not session
+    await news_api.close()
+
+
+@pytest.mark.asyncio
+async def test_request_feed_conditional(news_api, db):
+    url = "https://news.google.com/rss/topics/test"
+    rss = """<?xml version="1.0"?><rss version="2.0"><channel><title>t</title>
+        <item><title>Example Article</title><link>news.google/rss/1</link></item>
+        </channel></rss>"""
+
+    with aioresponses() as m:
+        m.get(url, status=200, body=rss, headers={"ETag": '"v1"'})
+        m.get(url, status=304)
+        entries = await news_api.request_feed(db=db, url=url)
+        cached_entries = await news_api.request_feed(db=db, url=url)
+        requests = list(m.requests.values())[0]
+
+    assert [x["title"] for x in entries] == ["Example Article"]
+    assert cached_entries is entries
+    assert requests[1].kwargs["headers"]["If-None-Match"] == '"v1"'
+    assert db.feed_cache.find_one({"url": url})["etag"] == '"v1"'
+
+
+@pytest.mark.asyncio
+async def test_extraction_error_fails_one_article(mocker, content, news_api, db):
+    resp = MockResponse(content[0], 200)
+    resp.url = "mock://example.com/article1"
+    mocker.patch("aiohttp.ClientSession.get", side_effect=[resp])
+    mocker.patch.object(
+        news_api.extractor,
+        "extract_with_rule",
+        side_effect=BrokenProcessPool("worker died"),
+    )
+
+    result = await news_api.extract_article_content(
+        "mock://example.com/article1", source="Example News", kw="", db=db
+    )
+
+    assert result == (None, "mock://example.com/article1")
+
+
+@pytest.mark.asyncio
+async def test_request_with_header_rejects_non_html(mocker, news_api):
+    resp = MockResponse(b"%PDF-1.4", 200, content_type="application/pdf")
+    resp.url = "mock://example.com/report.pdf"
+    mocker.patch("aiohttp.ClientSession.get", side_effect=[resp])
+
+    with pytest.raises(DownloadAborted):
+        await news_api.request_with_header(
+            "mock://example.com/report.pdf", domain="example.com"
+        )
+
+    assert news_api.download_aborts["example.com"]["content-type"] == 1
+
+
+@pytest.mark.asyncio
+async def test_process_article_skips_recent_failure(
+    mocker, mock_articles, news_api, db
+):
+    get = mocker.patch("aiohttp.ClientSession.get")
+    news_api.download_failures.record(
+        db=db, url=mock_articles[1]["link"], link=mock_articles[1]["link"]
+    )
+
+    result = await news_api.process_article(
+        article=mock_articles[1], url_hash="url_hash", db=db, rank=0, kw=""
+    )
+
+    assert result is None
+    get.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_download_checks_failures_once_per_feed(
+    mocker, mock_articles, news_api, db
+):
+    get = mocker.patch("aiohttp.ClientSession.get")
+    is_failed = mocker.spy(news_api.download_failures, "is_failed")
+    for article in mock_articles:
+        news_api.download_failures.record(
+            db=db, url=article["link"], link=article["link"]
+        )
+
+    results = await news_api.download(mock_articles, "url_hash", db, kw="")
+
+    assert results == [None, None]
+    get.assert_not_called()
+    is_failed.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_process_article_dedupes_on_resolved_url(mocker, news_api, db):
+    get = mocker.patch("aiohttp.ClientSession.get")
+    news_api.redirects.set(
+        db=db, link="news.google/rss/other", url="mock://example.com/article3"
+    )
+    article = {
+        "link": "news.google/rss/other",
+        "published": "Fri, 19 May 2023 21:40:11 GMT",
+        "source": {"title": "Example News"},
+        "title": "Another Article",
+    }
+
+    result = await news_api.process_article(
+        article=article, url_hash="url_hash", db=db, rank=0, kw=""
+    )
+
+    assert result["content"] == "This was already in the database"
+    get.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_download_resolves_redirects_once_per_feed(mocker, news_api, db):
+    get = mocker.patch("aiohttp.ClientSession.get")
+    mocker.patch.object(news_api, "redirects", RedirectCache())
+    RedirectCache().set(
+        db=db, link="news.google/rss/moved", url="mock://example.com/article3"
+    )
+    find_one = mocker.spy(db.link_redirects, "find_one")
+    article = {
+        "link": "news.google/rss/moved",
+        "published": "Fri, 19 May 2023 21:40:11 GMT",
+        "source": {"title": "Example News"},
+        "title": "Another Article",
+    }
+
+    results = await news_api.download([article], "url_hash", db, kw="")
+
+    assert results[0]["content"] == "This was already in the database"
+    get.assert_not_called()
+    find_one.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_download_only_fetches_misses(
+    mocker, content, mock_articles, news_api, db
+):
+    resp = MockResponse(content[0], 200)
+    resp.url = "mock://example.com/article1"
+    get = mocker.patch("aiohttp.ClientSession.get", side_effect=[resp])
+    stored = {**mock_articles[1], "link": "news.google/rss/3"}
+
+    results = await news_api.download(
+        [mock_articles[0], stored], "sample_url_hash", db, kw=""
+    )
+
+    assert get.call_count == 1
+    assert results[0]["content"] == "Pod of Dolphins Spotted off Miami Beach"
+    assert results[1]["content"] == "This was already in the database"
+    stored_links = news_api.check_db_for_articles(["news.google/rss/3", "missing"], db)
+    assert stored_links.keys() == {"news.google/rss/3"}
+
+
+@pytest.mark.asyncio
+async def test_query_news_by_keywords_concurrent(mocker, news_api, db):
+    calls = []
+
+    async def feed_entries(db, url):
+        calls.append(url)
+        await asyncio.sleep(0.01)
+        return [{"link": f"{url}/{i}"} for i in range(18)]
+
+    async def fetch_google(db, url, kw, entries):
+        calls.append(kw)
+        await asyncio.sleep(0.01)
+        return [{"kw": kw, "n": i} for i in range(7)]
+
+    mocker.patch.object(news_api, "feed_entries", side_effect=feed_entries)
+    mocker.patch.object(news_api, "fetch_google", side_effect=fetch_google)
+
+    results = await asyncio.gather(
+        news_api.query_news_by_keywords(db=db, q="us,business"),
+        news_api.query_news_by_keywords(db=db, q="business"),
+    )
+
+    # one feed request and one download per feed, shared by both queries
+    assert sorted(calls) == sorted(
+        ["business", "us", news_api.create_url("business"), news_api.create_url("us")]
+    )
+    assert [x["kw"] for x in results[0]] == ["us"] * 7 + ["business"] * 7
+    assert len(results[1]) == 7
+
+
+@pytest.mark.asyncio
+async def test_cancelled_fetch_is_not_treated_as_complete(mocker, news_api, db):
+    url = "https://news.google.com/rss/search?q=partial"
+    url_hash = news_api.get_hash(url=url)
+    entries = [{"link": f"news.google/rss/p{i}"} for i in range(5)]
+    downloads = []
+
+    async def download(articles, url_hash, db, kw):
+        downloads.append(len(articles))
+        db.articles.insert_one({"link": articles[0]["link"], "query_id": url_hash})
+        await asyncio.sleep(10)
+
+    mocker.patch.object(news_api, "download", side_effect=download)
+    fetch = asyncio.ensure_future(
+        news_api.request_google(db=db, url=url, kw="partial", entries=entries)
+    )
+    await asyncio.sleep(0.01)
+    fetch.cancel()
+    await asyncio.gather(fetch, return_exceptions=True)
+    assert not news_api.query_completed(db=db, url_hash=url_hash)
+
+    async def complete_download(articles, url_hash, db, kw):
+        downloads.append(len(articles))
+
+    mocker.patch.object(news_api, "download", side_effect=complete_download)
+    await news_api.request_google(db=db, url=url, kw="partial", entries=entries)
+    await news_api.request_google(db=db, url=url, kw="partial", entries=entries)
+
+    # the partial fetch is downloaded again, then the completed one is reused
+    assert downloads == [5, 5]
+    assert news_api.query_completed(db=db, url_hash=url_hash)
+
+
+def mock_query(mocker, news_api, n_entries, primary_delay, n_primary, calls):
+    async def feed_entries(db, url):
+        calls.append("feed")
+        return [{"link": f"https://example.com/{i}"} for i in range(n_entries)]
+
+    async def request_google(db, url, kw, entries):
+        await asyncio.sleep(primary_delay)
+        calls.append("primary")
+        return [{"from": "primary"} for _ in range(n_primary)]
+
+    async def query_alternate(query, db):
+        calls.append("alternate")
+        return [{"from": "alternate"} for _ in range(2)]
+
+    async def query_topic(query, db):
+        calls.append("topic")
+        return [{"from": "topic"} for _ in range(4)]
+
+    mocker.patch.object(news_api, "feed_entries", side_effect=feed_entries)
+    mocker.patch.object(news_api, "request_google", side_effect=request_google)
+    mocker.patch.object(news_api, "query_alternate", side_effect=query_alternate)
+    mocker.patch.object(news_api, "query_topic", side_effect=query_topic)
+
+
+@pytest.mark.asyncio
+async def test_query_keyword_speculative_fallbacks(mocker, news_api, db):
+    calls = []
+    mock_query(
+        mocker, news_api, n_entries=3, primary_delay=0.05, n_primary=3, calls=calls
+    )
+
+    results = await news_api.query_keyword(db=db, query="sparse")
+
+    # a sparse feed starts the fallbacks before the downloads finish
+    assert calls.index("alternate") < calls.index("primary")
+    assert [x["from"] for x in results] == ["primary"] * 3 + ["alternate"] * 2 + [
+        "topic"
+    ] * 4
+
+
+@pytest.mark.asyncio
+async def test_query_keyword_no_fallbacks_when_enough(mocker, news_api, db):
+    calls = []
+    mock_query(
+        mocker, news_api, n_entries=18, primary_delay=0, n_primary=7, calls=calls
+    )
+
+    results = await news_api.query_keyword(db=db, query="plenty")
+
+    assert calls == ["feed", "primary"]
+    assert len(results) == 7
+
+
+@pytest.mark.asyncio
+async def test_query_keyword_fallbacks_after_sparse_downloads(mocker, news_api, db):
+    calls = []
+    mock_query(
+        mocker, news_api, n_entries=18, primary_delay=0.01, n_primary=3, calls=calls
+    )
+
+    results = await news_api.query_keyword(db=db, query="paywalled")
+
+    assert calls[:2] == ["feed", "primary"]
+    assert [x["from"] for x in results] == ["primary"] * 3 + ["alternate"] * 2 + [
+        "topic"
+    ] * 4
+
+
+@pytest.mark.asyncio
+async def test_query_keyword_deadline(mocker, news_api, db):
+    calls = []
+    mock_query(
+        mocker, news_api, n_entries=3, primary_delay=10, n_primary=7, calls=calls
+    )
+    mocker.patch.object(news_api, "keyword_deadline", 0.05)
+
+    results = await news_api.query_keyword(db=db, query="slow")
+
+    assert "primary" not in calls
+    assert [x["from"] for x in results] == ["alternate"] * 2 + ["topic"] * 4
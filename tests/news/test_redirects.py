@@ -0,0 +1,33 @@
+import mongomock
+
+from tailoredscoop.news.redirects import RedirectCache
+
+
+def test_redirect_cache_persists_across_instances():
+    db = mongomock.MongoClient().db
+    cache = RedirectCache()
+    assert cache.get(db=db, link="news.google/rss/1") is None
+
+    cache.set(db=db, link="news.google/rss/1", url="https://example.com/a")
+    cache.set(db=db, link="news.google/rss/2", url="news.google/rss/2")
+
+    fresh = RedirectCache()
+    assert fresh.get(db=db, link="news.google/rss/1") == "https://example.com/a"
+    assert fresh.get(db=db, link="news.google/rss/2") is None
+    assert db.link_redirects.count_documents({}) == 1
+
+
+def test_redirect_cache_preload():
+    db = mongomock.MongoClient().db
+    RedirectCache().set(db=db, link="news.google/rss/1", url="https://example.com/a")
+
+    cache = RedirectCache()
+    cache.preload(db=db, links=["news.google/rss/1", "news.google/rss/2"])
+    db.link_redirects.drop()
+
+    # both links are answered from memory
+    assert cache.get(db=db, link="news.google/rss/1") == "https://example.com/a"
+    assert cache.get(db=db, link="news.google/rss/2") is None
+
+    cache.set(db=db, link="news.google/rss/2", url="https://example.com/b")
+    assert cache.get(db=db, link="news.google/rss/2") == "https://example.com/b"
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from tailoredscoop.news.scheduler import DownloadScheduler, FairGate
+
+
+@pytest.mark.asyncio
+async def test_fair_gate_round_robin():
+    gate = FairGate(capacity=1)
+    await gate.acquire("holder")
+    order = []
+
+    async def worker(key, i):
+        await gate.acquire(key)
+        order.append((key, i))
+        gate.release()
+
+    tasks = [asyncio.create_task(worker("a", i)) for i in range(3)]
+    tasks += [asyncio.create_task(worker("b", i)) for i in range(2)]
+    await asyncio.sleep(0)
+    assert gate.queued == 5
+
+    gate.release()
+    await asyncio.gather(*tasks)
+
+    assert order == [("a", 0), ("b", 0), ("a", 1), ("b", 1), ("a", 2)]
+    assert gate.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_fair_gate_cancelled_waiter():
+    gate = FairGate(capacity=1)
+    await gate.acquire()
+    task = asyncio.create_task(gate.acquire("a"))
+    await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert gate.queued == 0
+    gate.release()
+    assert gate.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_per_domain_limit():
+    scheduler = DownloadScheduler(max_in_flight=10, max_per_domain=2, domain_interval=0)
+    active = {"example.com": 0, "other.com": 0}
+    peak = {"example.com": 0, "other.com": 0}
+
+    async def request(domain, kw):
+        async with scheduler.slot(domain, key=kw):
+            active[domain] += 1
+            peak[domain] = max(peak[domain], active[domain])
+            await asyncio.sleep(0.01)
+            active[domain] -= 1
+
+    await asyncio.gather(
+        *[request("example.com", f"kw{i % 2}") for i in range(6)],
+        *[request("other.com", "kw0") for i in range(3)],
+    )
+
+    assert peak == {"example.com": 2, "other.com": 2}
+    stats = scheduler.stats()
+    assert stats["requests"] == 9
+    assert stats["queued"] == 0
+    assert stats["in_flight"] == 0
+    assert stats["max_wait"] > 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_domain_interval():
+    scheduler = DownloadScheduler(domain_interval=0.05)
+    loop = asyncio.get_running_loop()
+    starts = []
+
+    async def request():
+        async with scheduler.slot("example.com"):
+            starts.append(loop.time())
+
+    await asyncio.gather(*[request() for _ in range(3)])
+
+    assert starts[-1] - starts[0] >= 0.09
+
+
+def test_domain_of():
+    assert DownloadScheduler.domain_of("https://www.CNN.com/a/b") == "www.cnn.com"
+    assert DownloadScheduler.domain_of(None) == ""
@@ -0,0 +1,60 @@
+import pytest
+
+from tailoredscoop.news.stream import ParagraphMeter, read_limited
+
+
+class MockContent:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.n_read = 0
+
+    async def iter_chunked(self, n):
+        for chunk in self.chunks:
+            self.n_read += 1
+            yield chunk
+
+
+class MockResponse:
+    def __init__(self, chunks, charset="utf-8"):
+        self.charset = charset
+        self.content = MockContent(chunks)
+
+
+def test_paragraph_meter_across_chunks():
+    meter = ParagraphMeter()
+    assert meter.feed("<html><body><p>Hello <b>wor") == 0
+    assert meter.feed("ld</b></p><pre>x</pre><p>abc</p>") == len("Hello world") + 3
+    assert meter.feed("<p class='x'>de") == 14
+    assert meter.feed("f</p>") == 17
+
+
+@pytest.mark.asyncio
+async def test_read_limited_stops_at_text_budget():
+    chunks = [b"<p>" + b"a" * 100 + b"</p>" for _ in range(10)]
+    response = MockResponse(chunks)
+
+    text, truncated = await read_limited(response, max_bytes=10_000, text_budget=250)
+
+    assert not truncated
+    assert response.content.n_read == 3
+    assert text.count("<p>") == 3
+
+
+@pytest.mark.asyncio
+async def test_read_limited_max_bytes():
+    response = MockResponse([b"x" * 100] * 10)
+
+    text, truncated = await read_limited(response, max_bytes=250, text_budget=1000)
+
+    assert truncated
+    assert len(text) == 300
+
+
+@pytest.mark.asyncio
+async def test_read_limited_decodes_split_characters():
+    data = "<p>café</p>".encode("utf-8")
+    response = MockResponse([data[:7], data[7:]])
+
+    text, _ = await read_limited(response, max_bytes=1000, text_budget=1000)
+
+    assert text == "<p>café</p>"
@@ -0,0 +1,182 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from tailoredscoop.openai_api import (
+    ChatCompletion,
+    RateLimiter,
+    num_tokens_from_messages,
+    num_tokens_from_texts,
+)
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after=None):
+        super().__init__("rate limited")
+        self.headers = {"Retry-After": retry_after} if retry_after else {}
+
+
+def test_backoff_uses_retry_after():
+    chat = ChatCompletion(backoff_max=30)
+    assert chat.backoff(0, RateLimited("7")) == 7
+    assert chat.backoff(0, RateLimited("120")) == 30
+
+
+def test_backoff_full_jitter_is_bounded():
+    chat = ChatCompletion(backoff_base=2, backoff_max=10)
+    for attempt in range(6):
+        delay = chat.backoff(attempt, RateLimited())
+        assert 0 <= delay <= min(10, 2 * 2**attempt)
+
+
+@pytest.mark.asyncio
+async def test_acreate_retries_without_blocking():
+    chat = ChatCompletion(max_attempts=3, limiter=None)
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+
+    with patch(
+        "openai.ChatCompletion.acreate",
+        AsyncMock(side_effect=[RateLimited("1"), RateLimited("2"), {"ok": True}]),
+    ) as acreate, patch("tailoredscoop.openai_api.asyncio.sleep", fake_sleep):
+        assert await chat.acreate(messages=[]) == {"ok": True}
+
+    assert acreate.await_count == 3
+    assert sleeps == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_acreate_gives_up_after_max_attempts():
+    chat = ChatCompletion(max_attempts=2, backoff_base=0, limiter=None)
+    with patch(
+        "openai.ChatCompletion.acreate", AsyncMock(side_effect=RateLimited())
+    ) as acreate:
+        assert await chat.acreate(messages=[]) is None
+    assert acreate.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_acreate_limits_concurrency():
+    chat = ChatCompletion(max_concurrency=2, limiter=None)
+    in_flight = 0
+    peak = 0
+
+    async def fake_acreate(**kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return {}
+
+    with patch("openai.ChatCompletion.acreate", fake_acreate):
+        await asyncio.gather(*[chat.acreate(messages=[]) for _ in range(6)])
+
+    assert peak == 2
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_limiter_settles_with_actual_usage():
+    clock = FakeClock()
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=1000, clock=clock)
+
+    reserved = asyncio.run(limiter.acquire(600))
+    assert limiter.headroom() == {"requests": 59, "tokens": 400, "queued": 0}
+
+    limiter.settle(reserved, 150)
+    assert limiter.headroom()["tokens"] == 850
+
+    clock.now = 6.0  # a tenth of a minute refills 100 tokens
+    assert limiter.headroom()["tokens"] == 950
+
+
+@pytest.mark.asyncio
+async def test_limiter_serves_callers_in_order():
+    clock = FakeClock()
+    limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=100, clock=clock)
+    order = []
+
+    async def fake_sleep(delay):
+        clock.now += delay
+
+    async def call(name, tokens):
+        await limiter.acquire(tokens)
+        order.append(name)
+
+    with patch("tailoredscoop.openai_api.asyncio.sleep", fake_sleep):
+        await asyncio.gather(call("big", 100), call("huge", 500), call("small", 1))
+
+    # "huge" is clamped to the bucket size and "small" does not jump the queue
+    assert order == ["big", "huge", "small"]
+    assert clock.now == pytest.approx(60.6)
+
+
+def test_limiter_shared_across_threads():
+    limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=60000)
+
+    def reserve(_):
+        return asyncio.run(limiter.acquire(15100))
+
+    # the fourth caller waits ~0.4s on another thread's loop for the refill
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        assert list(pool.map(reserve, range(4))) == [15100] * 4
+
+    assert limiter.headroom()["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_acreate_reserves_prompt_and_max_tokens():
+    limiter = RateLimiter(requests_per_minute=10, tokens_per_minute=1000)
+    chat = ChatCompletion(limiter=limiter)
+    seen = []
+
+    async def fake_acreate(**kwargs):
+        seen.append(limiter.headroom()["tokens"])
+        return {"usage": {"total_tokens": 30}}
+
+    with patch("openai.ChatCompletion.acreate", fake_acreate), patch(
+        "tailoredscoop.openai_api.num_tokens_from_messages", return_value=20
+    ):
+        await chat.acreate(messages=[{"role": "user", "content": "hi"}], max_tokens=80)
+
+    assert seen[0] <= 900
+    assert 960 <= limiter.headroom()["tokens"] <= 1000
+
+
+class WordEncoding:
+    def encode(self, text):
+        return text.split()
+
+    def encode_batch(self, texts):
+        return [self.encode(text) for text in texts]
+
+
+def test_token_counts_resolve_aliases_and_batch():
+    with patch(
+        "tailoredscoop.openai_api.get_encoding", return_value=WordEncoding()
+    ) as get_encoding:
+        texts = ["one two three", "four"]
+        single = [
+            num_tokens_from_messages([{"content": text}], model="gpt-3.5-turbo")
+            for text in texts
+        ]
+        assert single == [10, 8]
+        assert num_tokens_from_texts(texts, model="gpt-3.5-turbo") == single
+        assert num_tokens_from_messages(
+            [{"role": "user", "name": "x", "content": "a b"}], model="gpt-4"
+        ) == 3 + 4 + 1 + 3
+
+    get_encoding.assert_called_with("gpt-4-0314")
+    with pytest.raises(NotImplementedError):
+        num_tokens_from_texts(texts, model="davinci")
@@ -44,7 +44,7 @@ def abridge_summary():
 @pytest.fixture
 def get_subject():
     with patch(
-        "tailoredscoop.documents.summarize.OpenaiSummarizer.get_subject"
+        "tailoredscoop.documents.summarize.OpenaiSummarizer.aget_subject"
     ) as get_subject:
         yield get_subject
 
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from tailoredscoop.utils import SingleFlight, run_sync
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_one_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return [key]
+
+    results = await asyncio.gather(
+        *[flight.do("a", fetch, "a") for _ in range(5)], flight.do("b", fetch, "b")
+    )
+
+    assert calls == ["a", "b"]
+    assert results == [["a"]] * 5 + [["b"]]
+    assert len(flight) == 0
+
+    await flight.do("a", fetch, "a")
+    assert calls == ["a", "b", "a"]
+
+
+@pytest.mark.asyncio
+async def test_single_flight_survives_cancelled_waiter():
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        return "done"
+
+    first = asyncio.ensure_future(flight.do("a", fetch))
+    second = asyncio.ensure_future(flight.do("a", fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "done"
+
+
+@pytest.mark.asyncio
+async def test_single_flight_cancels_when_last_waiter_leaves():
+    flight = SingleFlight()
+    cancelled = []
+
+    async def fetch():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    first = asyncio.ensure_future(flight.do("a", fetch))
+    second = asyncio.ensure_future(flight.do("a", fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    assert not cancelled
+
+    second.cancel()
+    await asyncio.gather(first, second, return_exceptions=True)
+    await asyncio.sleep(0)
+
+    assert cancelled == [True]
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_single_flight_propagates_errors():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        flight.do("a", fail), flight.do("a", fail), return_exceptions=True
+    )
+
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+async def add(a, b):
+    await asyncio.sleep(0)
+    return a + b
+
+
+def test_run_sync():
+    assert run_sync(add(1, 2)) == 3
+
+
+@pytest.mark.asyncio
+async def test_run_sync_inside_running_loop():
+    assert run_sync(add(1, 2)) == 3